@@ -1,8 +1,29 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
 from passlib.context import CryptContext
 
 # Initialize the password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs on its own process pool, so a login burst cannot starve the
+# threadpool and event loop serving every other endpoint. Calls beyond
+# PASSWORD_HASH_MAX_PENDING (running and queued) are rejected at once.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_pending = 0
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing pool already has PASSWORD_HASH_MAX_PENDING calls."""
+
 def hash_password(password: str) -> str:
     """
     Hash a plaintext password using bcrypt.
@@ -27,3 +48,88 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         bool: True if the password matches, False otherwise.
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def start_password_pool() -> None:
+    """
+    Create the password hashing process pool, if it is not running yet.
+    """
+    global _executor
+    if _executor is None:
+        # Spawned workers only import this module, not the forked state of the app
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+
+def shutdown_password_pool() -> None:
+    """
+    Stop the password hashing process pool, dropping queued calls.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run_in_pool(func: Callable[..., Any], *args: Any) -> Any:
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHashingBusy("Too many password operations in progress")
+    start_password_pool()
+    _pending += 1
+    try:
+        executor = _executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory) and the pool refuses all work
+            # from then on. Hashing is pure, so the call is retried once on a new
+            # pool; concurrent calls that failed with it replace it only once.
+            logging.warning("Password hashing pool is broken, starting a new one")
+            _replace_broken_pool(executor)
+            return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _pending -= 1
+
+
+def _replace_broken_pool(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    if _executor is broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    start_password_pool()
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a plaintext password on the password hashing pool.
+
+    Args:
+        password (str): The plaintext password to hash.
+
+    Returns:
+        str: The hashed password.
+
+    Raises:
+        PasswordHashingBusy: If the pool is full.
+    """
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a plaintext password on the password hashing pool.
+
+    Args:
+        plain_password (str): The plaintext password to verify.
+        hashed_password (str): The hashed password to compare against.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+
+    Raises:
+        PasswordHashingBusy: If the pool is full.
+    """
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
@@ -1,10 +1,12 @@
 from datetime import datetime, timedelta
 from typing import Optional, Callable, Dict, Any
+import hashlib
 import time
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import HTTPException, Request, status, Depends
 from functools import wraps
 import jwt
+import orjson
 from jose import JWTError
 
 
@@ -12,6 +14,9 @@ import os
 
 from dotenv import load_dotenv
 
+from app.cache.memory import MemoryCache
+from app.database.connection import current_client
+
 load_dotenv()
 # Constants for JWT configuration
 SECRET_KEY: str = os.getenv("SECRET_KEY")
@@ -19,8 +24,15 @@ ALGORITHM: str = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 JWT_SECRET: str =  os.getenv("JWT_SECRET")
 
+# Already verified token payloads, JSON encoded and keyed by digest, kept until the
+# token's exp at the latest.
+# Set AUTH_TOKEN_CACHE_MAX_BYTES=0 to verify the signature on every request.
+AUTH_TOKEN_CACHE_MAX_BYTES: int = int(os.getenv("AUTH_TOKEN_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+verified_tokens = MemoryCache(AUTH_TOKEN_CACHE_MAX_BYTES, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -70,6 +82,72 @@ def decode_jwt(token: str) -> Optional[Dict[str, Any]]:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a token's signature and claims, reusing earlier verifications.
+
+    A verified payload is cached, JSON encoded, under a digest of the token until
+    the token expires, so a client reusing its token pays for the signature check
+    once. Decoding the cached payload is far cheaper than verifying the signature.
+
+    Args:
+        token (str): The bearer token.
+
+    Returns:
+        Dict[str, Any]: The token payload.
+
+    Raises:
+        HTTPException: If the token is invalid, expired or has no subject.
+    """
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    cached = verified_tokens.get(digest)
+    if cached is not None:
+        return orjson.loads(cached)
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except (jwt.InvalidTokenError, JWTError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    if not payload.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    verified_tokens.set(digest, orjson.dumps(payload), expires_in)
+    return payload
+
+
+async def get_current_principal(request: Request) -> Dict[str, Any]:
+    """
+    Dependency returning the authenticated token payload of the request.
+
+    The payload is verified once per request and kept on request.state, so
+    requires_auth and handlers depending on this share the same result.
+
+    Args:
+        request (Request): The HTTP request object.
+
+    Returns:
+        Dict[str, Any]: The token payload; the username is under "sub".
+
+    Raises:
+        HTTPException: If the token is missing or invalid.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is None:
+        token: str = await oauth2_scheme(request)
+        principal = verify_token(token)
+        request.state.principal = principal
+    # Lets the database layer route this client's reads after its own writes
+    current_client.set(principal.get("sub"))
+    return principal
+
+
 def requires_auth(func: Callable) -> Callable:
     """
     Decorator to require authentication for an endpoint.
@@ -85,23 +163,7 @@ def requires_auth(func: Callable) -> Callable:
     """
     @wraps(func)
     async def wrapper(request: Request, *args, **kwargs) -> Any:
-        try:
-            # Extract the token using the OAuth2 scheme
-            token: str = await oauth2_scheme(request)
-
-            # Decode the JWT token
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            username = payload.get("sub")
-            if not username:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid authentication credentials",
-                )
-            # Pass the username to the wrapped function
-            return await func(request, *args, **kwargs)  # Forward all arguments
-        except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-            )
+        # Verify the token, or reuse the principal a dependency already resolved
+        await get_current_principal(request)
+        return await func(request, *args, **kwargs)  # Forward all arguments
     return wrapper
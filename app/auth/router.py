@@ -1,14 +1,14 @@
 from fastapi import APIRouter, HTTPException
 from app.schemas.auth import UserCreate, Token
-from app.auth.hashing import hash_password, verify_password
+from app.auth.hashing import hash_password_async, verify_password_async, PasswordHashingBusy
 from app.auth.jwt import create_access_token
-from app.database.users import get_user, create_user_in_db
+from app.database.users import get_user, get_password_hash, create_user_in_db
 
 router = APIRouter()
 
 
 @router.post("/create-user", response_model=Token)
-def create_user(user: UserCreate) -> Token:
+async def create_user(user: UserCreate) -> Token:
     """
     Create a new user in the database and return a JWT token.
 
@@ -19,13 +19,18 @@ def create_user(user: UserCreate) -> Token:
         Token: An access token for the newly created user.
 
     Raises:
-        HTTPException: If the user already exists in the database.
+        HTTPException: If the user already exists in the database, or 503 if
+            the password hashing pool is full.
     """
-    if get_user(user.username):  # Check if user already exists
+    if await get_user(user.username):  # Check if user already exists
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed_password = hash_password(user.password)
-    result = create_user_in_db(user.username, hashed_password)
+    # bcrypt is CPU bound, it runs on the bounded password hashing pool
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    result = await create_user_in_db(user.username, hashed_password)
 
     if result["status"] == "error":
         raise HTTPException(status_code=500, detail=result["message"])
@@ -37,7 +42,7 @@ def create_user(user: UserCreate) -> Token:
 
 
 @router.post("/token", response_model=Token)
-def login(user: UserCreate) -> dict[str, str]:
+async def login(user: UserCreate) -> dict[str, str]:
     """
     Authenticate a user and generate an access token.
 
@@ -48,13 +53,18 @@ def login(user: UserCreate) -> dict[str, str]:
         Token: An access token if authentication is successful.
 
     Raises:
-        HTTPException: If the username or password is invalid.
+        HTTPException: If the username or password is invalid, or 503 if the
+            password hashing pool is full.
     """
 
-    db_user = get_user(user.username)
+    password_hash = await get_password_hash(user.username)
 
     # Verify the user's credentials
-    if not db_user or not verify_password(user.password, db_user["password_hash"]):
+    try:
+        valid = password_hash is not None and await verify_password_async(user.password, password_hash)
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
     access_token = create_access_token({"sub": user.username})
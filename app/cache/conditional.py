@@ -0,0 +1,85 @@
+import hashlib
+import os
+from typing import Any, Dict
+
+import orjson
+from fastapi import Request, Response
+
+from app.cache.redis import CACHE_FORMAT_VERSION, current_generation
+
+# How long clients and a reverse proxy may reuse a search response without
+# revalidating it. Writes show up after at most this many seconds.
+SEARCH_CACHE_MAX_AGE = int(os.getenv("SEARCH_CACHE_MAX_AGE", "2"))
+
+
+async def search_etag(entity: str, params: Dict[str, Any]) -> str:
+    """
+    Build a weak ETag for a search response from the entity's generation and the query.
+
+    The generation changes on every committed write to the entity, so the ETag
+    changes exactly when the response may have, and computing it never touches
+    Postgres.
+
+    Args:
+        entity (str): The entity searched, e.g. "employees".
+        params (Dict[str, Any]): The query parameters that shape the response.
+
+    Returns:
+        str: The ETag, e.g. 'W/"3f2a9c0d1e7b4a65"'.
+    """
+    generation = await current_generation(entity)
+    payload = orjson.dumps([entity, CACHE_FORMAT_VERSION, generation, params], option=orjson.OPT_SORT_KEYS)
+    return f'W/"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag, with weak comparison.
+
+    Args:
+        request (Request): The HTTP request object.
+        etag (str): The ETag of the current response.
+
+    Returns:
+        bool: Whether the client already holds the current response.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """
+    Return the caching headers of a search response.
+
+    Responses vary by Authorization, so a shared cache keeps a copy per token
+    and never serves one client's response to another, unauthenticated one.
+
+    Args:
+        etag (str): The ETag of the response.
+
+    Returns:
+        Dict[str, str]: The ETag, Cache-Control and Vary headers.
+    """
+    return {
+        "ETag": etag,
+        "Cache-Control": f"max-age={SEARCH_CACHE_MAX_AGE}, s-maxage={SEARCH_CACHE_MAX_AGE}, must-revalidate",
+        "Vary": "Authorization",
+    }
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Build the 304 Not Modified response for a matching If-None-Match.
+
+    Args:
+        etag (str): The ETag of the current response.
+
+    Returns:
+        Response: An empty response with the caching headers.
+    """
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# In-process tier in front of Redis, sized by bytes. Set CACHE_MEMORY_MAX_BYTES=0 to disable.
+CACHE_MEMORY_MAX_BYTES = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(16 * 1024 * 1024)))
+CACHE_MEMORY_TTL = float(os.getenv("CACHE_MEMORY_TTL", "30"))
+
+
+class MemoryCache:
+    """
+    A bounded in-process cache with LRU eviction and per-entry TTL.
+
+    Capacity is measured in bytes of the stored keys and values, so a handful of
+    large pages cannot crowd out memory the way an entry count limit would allow.
+    Not thread safe: it is only used from the event loop.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes, int]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return a live entry and mark it as most recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[bytes]: The cached value, or None if it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting least recently used entries until it fits.
+
+        Args:
+            key (str): The cache key.
+            value (bytes): The serialized value to store.
+            ttl (Optional[float]): Time to live in seconds, capped at the tier's TTL.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        while self.current_bytes + size > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+        self._entries[key] = (time.monotonic() + ttl, value, size)
+        self.current_bytes += size
+
+    def clear(self) -> None:
+        """
+        Drop every entry.
+        """
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the tier's counters.
+
+        Returns:
+            Dict[str, float]: Hits, misses, hit ratio, evictions, entries and bytes used.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / max(self.hits + self.misses, 1),
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+
+memory_cache = MemoryCache(max_bytes=CACHE_MEMORY_MAX_BYTES, ttl=CACHE_MEMORY_TTL)
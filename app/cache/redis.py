@@ -1,10 +1,242 @@
-import redis
+import redis.asyncio as redis
 import os
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
 
 from dotenv import load_dotenv
+from redis.asyncio.client import Pipeline
+
+from app.cache.memory import memory_cache
 
 load_dotenv()
 REDIS_HOST = os.getenv("REDIS_HOST")
-REDIS_PORT = int(os.getenv("REDIS_PORT"))
-CACHE_EXPIRATION = 60
-redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1"))
+# Set REDIS_FAKE=1 to run against an in-process fakeredis server (tests, local runs)
+REDIS_FAKE = os.getenv("REDIS_FAKE", "").lower() in ("1", "true", "yes")
+# Writes invalidate cached searches by bumping a generation counter, so the TTL
+# only bounds how long unreachable entries linger
+CACHE_EXPIRATION = int(os.getenv("CACHE_EXPIRATION", "900"))
+# Typeahead suggestions are keyed by every prefix typed, so they are kept briefly
+SUGGEST_CACHE_EXPIRATION = int(os.getenv("SUGGEST_CACHE_EXPIRATION", "60"))
+POPULAR_SEARCHES_KEY = "popular_searches"
+# Only the most searched terms of each family are kept, and a family nobody
+# searches any more expires, so the counters stay bounded
+POPULAR_SEARCHES_MAX = int(os.getenv("POPULAR_SEARCHES_MAX", "1000"))
+POPULAR_SEARCHES_EXPIRATION = int(os.getenv("POPULAR_SEARCHES_EXPIRATION", "86400"))
+GENERATION_KEY = "cache_generation"
+# Part of every versioned key; bump it when the layout of cached values changes
+CACHE_FORMAT_VERSION = 2
+
+# Per-process hit/miss counters, keyed by cache key family
+cache_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def create_redis_client() -> redis.Redis:
+    """
+    Create the async Redis client.
+
+    A blocking pool caps the number of sockets and makes callers wait for a free
+    connection instead of opening new ones under load.
+
+    Returns:
+        redis.Redis: The async Redis client.
+    """
+    if REDIS_FAKE:
+        # fakeredis is a development dependency only
+        from fakeredis import FakeAsyncRedis
+
+        return FakeAsyncRedis()
+
+    connection_pool = redis.BlockingConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=30,
+    )
+    return redis.Redis(connection_pool=connection_pool)
+
+
+redis_client = create_redis_client()
+
+
+async def current_generation(entity: str) -> int:
+    """
+    Return the generation of an entity, which every committed write to it bumps.
+
+    The counter is read from Redis on every call, never cached per worker, so a
+    write made through any worker invalidates the cached reads of all of them at once.
+
+    Args:
+        entity (str): The entity, e.g. "employees".
+
+    Returns:
+        int: The current generation.
+    """
+    return int(await redis_client.get(f"{GENERATION_KEY}:{entity}") or 0)
+
+
+async def versioned_cache_key(family: str, entity: str, suffix: str) -> str:
+    """
+    Build a cache key in the current generation of an entity's namespace.
+
+    Args:
+        family (str): The cache key family, e.g. "search_employees".
+        entity (str): The entity whose writes invalidate the family, e.g. "employees".
+        suffix (str): The query specific part of the key.
+
+    Returns:
+        str: The cache key, e.g. "search_employees:v2:g12:alice:0:10:None".
+    """
+    generation = await current_generation(entity)
+    return f"{family}:v{CACHE_FORMAT_VERSION}:g{generation}:{suffix}"
+
+
+async def versioned_cache_keys(family: str, entity: str, suffixes: Iterable[str]) -> List[str]:
+    """
+    Build many cache keys of one family with a single read of the generation.
+    See versioned_cache_key.
+    """
+    generation = await current_generation(entity)
+    return [f"{family}:v{CACHE_FORMAT_VERSION}:g{generation}:{suffix}" for suffix in suffixes]
+
+
+async def bump_generation(entity: str) -> Optional[int]:
+    """
+    Invalidate every cached entry of an entity by moving it to a new generation.
+
+    Entries of older generations are never read again and expire on their own.
+    Called after the write is committed, so a Redis failure is logged rather than
+    raised: the write succeeded, the cache just serves stale data until the TTL.
+
+    Args:
+        entity (str): The entity that was written, e.g. "employees".
+
+    Returns:
+        Optional[int]: The new generation, or None if Redis could not be reached.
+    """
+    try:
+        return await redis_client.incr(f"{GENERATION_KEY}:{entity}")
+    except redis.RedisError as e:
+        logging.error(f"Error bumping cache generation for {entity}: {e}")
+        return None
+
+
+def count_popular_searches(pipe: Pipeline, family: str, searches: List[str]) -> None:
+    """
+    Queue the popularity counts of searches on a pipeline, trimming the family's counters.
+
+    Args:
+        pipe (Pipeline): The pipeline to queue the commands on.
+        family (str): The cache key family, e.g. "search_employees".
+        searches (List[str]): The search terms to count.
+    """
+    key = f"{POPULAR_SEARCHES_KEY}:{family}"
+    for search in searches:
+        pipe.zincrby(key, 1, search)
+    pipe.zremrangebyrank(key, 0, -POPULAR_SEARCHES_MAX - 1)
+    pipe.expire(key, POPULAR_SEARCHES_EXPIRATION)
+
+
+async def get_cached(cache_key: str, family: str, search: Optional[str]) -> Optional[bytes]:
+    """
+    Read a cached value and count the search towards its family's popularity.
+
+    Both commands go out in a single pipeline, so a lookup costs one round trip.
+
+    Args:
+        cache_key (str): The cache key to read.
+        family (str): The cache key family, e.g. "search_employees".
+        search (Optional[str]): The search term to count.
+
+    Returns:
+        Optional[bytes]: The cached value, or None on a miss.
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.get(cache_key)
+        count_popular_searches(pipe, family, [search or ""])
+        cached_value = (await pipe.execute())[0]
+
+    cache_stats[family]["hits" if cached_value is not None else "misses"] += 1
+    return cached_value
+
+
+async def set_cached(cache_key: str, value: bytes, expiration: int = CACHE_EXPIRATION) -> None:
+    """
+    Store a value in the cache with an expiration.
+
+    Args:
+        cache_key (str): The cache key to write.
+        value (bytes): The serialized value.
+        expiration (int): Time to live in seconds.
+    """
+    await redis_client.setex(cache_key, expiration, value)
+
+
+async def get_or_set_cached(
+    cache_key: str,
+    family: str,
+    compute: Callable[[], Awaitable[bytes]],
+    expiration: int
+) -> bytes:
+    """
+    Read a short-lived value through both cache tiers, computing it on a miss.
+
+    Unlike the search cache there is no request coalescing, stale serving or
+    popularity tracking: this is meant for cheap, high-cardinality lookups
+    such as typeahead suggestions.
+
+    Args:
+        cache_key (str): The cache key.
+        family (str): The cache key family, for the hit/miss counters.
+        compute (Callable[[], Awaitable[bytes]]): Produces the value on a miss.
+        expiration (int): Time to live in seconds, in both tiers.
+
+    Returns:
+        bytes: The cached or computed value.
+    """
+    value = memory_cache.get(cache_key)
+    if value is not None:
+        return value
+
+    value = await redis_client.get(cache_key)
+    cache_stats[family]["hits" if value is not None else "misses"] += 1
+    if value is None:
+        value = await compute()
+        await set_cached(cache_key, value, expiration)
+    memory_cache.set(cache_key, value, expiration)
+    return value
+
+
+def get_cache_stats() -> Dict[str, Dict]:
+    """
+    Return the cache counters of this process, per tier.
+
+    Returns:
+        Dict[str, Dict]: The in-process tier's counters under "memory", and the
+            hit/miss counters and hit ratio of each cache key family under "redis".
+    """
+    return {
+        "memory": memory_cache.stats(),
+        "redis": {
+            family: {
+                **counters,
+                "hit_ratio": counters["hits"] / max(counters["hits"] + counters["misses"], 1),
+            }
+            for family, counters in cache_stats.items()
+        },
+    }
+
+
+async def close_redis() -> None:
+    """
+    Close the Redis client and its connection pool.
+    """
+    await redis_client.aclose()
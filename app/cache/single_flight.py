@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+import zlib
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.cache.memory import memory_cache
+from app.cache.redis import redis_client, get_cached, set_cached, cache_stats, count_popular_searches, CACHE_EXPIRATION
+
+# Entries are served as fresh for CACHE_SOFT_TTL seconds. After that, and until
+# the hard CACHE_EXPIRATION, the stale value is served while a single worker
+# refreshes it in the background. Set CACHE_SOFT_TTL=0 to disable.
+CACHE_SOFT_TTL = int(os.getenv("CACHE_SOFT_TTL", "300"))
+# How long a worker may hold the recompute lock of a key
+CACHE_LOCK_TTL_MS = int(os.getenv("CACHE_LOCK_TTL_MS", "5000"))
+# How often a worker that lost the lock polls the cache for the winner's result
+CACHE_LOCK_POLL_INTERVAL = 0.05
+LOCK_KEY = "lock"
+# Values at least this large are zlib compressed in Redis. 0 disables compression.
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "0"))
+
+# Computations in flight in this process, shared by every caller of the same key
+_inflight: Dict[str, asyncio.Task] = {}
+# Keys being refreshed in the background by this process
+_refreshing: Set[str] = set()
+# Keep references to background refreshes so they are not garbage collected
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _encode_entry(value: bytes) -> bytes:
+    """
+    Prefix a value with the time until which it is considered fresh and whether
+    it is compressed, e.g. b"1700000000.000|z|<zlib data>".
+    """
+    fresh_until = time.time() + CACHE_SOFT_TTL if CACHE_SOFT_TTL else float("inf")
+    if CACHE_COMPRESS_MIN_BYTES and len(value) >= CACHE_COMPRESS_MIN_BYTES:
+        return f"{fresh_until:.3f}|z|".encode() + zlib.compress(value, 1)
+    return f"{fresh_until:.3f}|-|".encode() + value
+
+
+def _decode_entry(entry: bytes) -> Tuple[float, bytes]:
+    """
+    Split a cache entry into its freshness deadline and value.
+    """
+    fresh_until, compression, value = entry.split(b"|", 2)
+    if compression == b"z":
+        value = zlib.decompress(value)
+    return float(fresh_until), value
+
+
+async def _acquire_lock(cache_key: str) -> Optional[str]:
+    """
+    Try to take the cross-worker recompute lock of a key.
+
+    Returns:
+        Optional[str]: The lock token if acquired, None if another worker holds it.
+    """
+    token = uuid.uuid4().hex
+    acquired = await redis_client.set(f"{LOCK_KEY}:{cache_key}", token, nx=True, px=CACHE_LOCK_TTL_MS)
+    return token if acquired else None
+
+
+async def _release_lock(cache_key: str, token: str) -> None:
+    """
+    Release a recompute lock, unless it expired and was taken by another worker.
+    """
+    lock_key = f"{LOCK_KEY}:{cache_key}"
+    if await redis_client.get(lock_key) == token.encode():
+        await redis_client.delete(lock_key)
+
+
+async def _compute_and_store(cache_key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+    """
+    Compute a value and store it in the cache.
+    """
+    value = await compute()
+    await set_cached(cache_key, _encode_entry(value))
+    memory_cache.set(cache_key, value, CACHE_SOFT_TTL or None)
+    return value
+
+
+async def _wait_for_other_worker(cache_key: str) -> Optional[bytes]:
+    """
+    Poll the cache while another worker holds the recompute lock.
+
+    Returns:
+        Optional[bytes]: The value stored by the other worker, or None if the lock
+            timed out without a value.
+    """
+    deadline = time.monotonic() + CACHE_LOCK_TTL_MS / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+        entry = await redis_client.get(cache_key)
+        if entry is not None:
+            return _decode_entry(entry)[1]
+    return None
+
+
+async def _load(cache_key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+    """
+    Recompute a missing key, letting only one worker across processes hit the database.
+    """
+    token = await _acquire_lock(cache_key)
+    if token is None:
+        value = await _wait_for_other_worker(cache_key)
+        if value is not None:
+            return value
+        # The lock holder failed or is too slow, compute it ourselves
+        return await _compute_and_store(cache_key, compute)
+
+    try:
+        return await _compute_and_store(cache_key, compute)
+    finally:
+        await _release_lock(cache_key, token)
+
+
+async def _coalesce(cache_key: str, load: Callable[[], Awaitable[bytes]]) -> bytes:
+    """
+    Run `load` once per key in this process; concurrent callers await the same result.
+
+    `load` runs in its own task, which every caller awaits through a shield, so a
+    caller being cancelled (e.g. its client disconnected) neither cancels the
+    computation nor fails the other callers.
+    """
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(load())
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda done: _finish_inflight(cache_key, done))
+    return await asyncio.shield(task)
+
+
+def _finish_inflight(cache_key: str, task: asyncio.Task) -> None:
+    """
+    Forget a finished computation, and mark its exception as retrieved in case
+    every caller was cancelled before it failed.
+    """
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+    if not task.cancelled():
+        task.exception()
+
+
+async def _refresh(cache_key: str, compute: Callable[[], Awaitable[bytes]]) -> None:
+    """
+    Refresh a stale key in the background if no other worker is already doing it.
+    """
+    try:
+        token = await _acquire_lock(cache_key)
+        if token is None:
+            return
+        try:
+            await _compute_and_store(cache_key, compute)
+        finally:
+            await _release_lock(cache_key, token)
+    except Exception as e:
+        logging.error(f"Error refreshing cache key {cache_key}: {e}")
+    finally:
+        _refreshing.discard(cache_key)
+
+
+def _schedule_refresh(cache_key: str, compute: Callable[[], Awaitable[bytes]]) -> None:
+    """
+    Start a background refresh of a stale key, at most one per key in this process.
+    """
+    if cache_key in _refreshing:
+        return
+    _refreshing.add(cache_key)
+    task = asyncio.create_task(_refresh(cache_key, compute))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def get_or_compute(
+    cache_key: str,
+    family: str,
+    search: Optional[str],
+    compute: Callable[[], Awaitable[bytes]]
+) -> bytes:
+    """
+    Return a cached value, computing it at most once per key when it is missing.
+
+    Concurrent misses on the same key are coalesced in process, and a short Redis
+    lock lets a single worker across processes run the query while the others wait
+    for its result. Values past their soft TTL are served stale while one worker
+    refreshes them in the background.
+
+    Hot keys are also kept in the in-process memory tier, which is consulted
+    first and never outlives the entry's soft TTL. Its keys embed the same
+    generation as the Redis keys, so writes invalidate both tiers.
+
+    Args:
+        cache_key (str): The cache key.
+        family (str): The cache key family, e.g. "search_employees".
+        search (Optional[str]): The search term, counted towards popularity.
+        compute (Callable[[], Awaitable[bytes]]): Produces the serialized value on a miss.
+
+    Returns:
+        bytes: The serialized value.
+    """
+    value = memory_cache.get(cache_key)
+    if value is not None:
+        return value
+
+    entry = await get_cached(cache_key, family, search)
+    if entry is not None:
+        fresh_until, value = _decode_entry(entry)
+        remaining = fresh_until - time.time()
+        if remaining <= 0:
+            cache_stats[family]["stale"] = cache_stats[family].get("stale", 0) + 1
+            _schedule_refresh(cache_key, compute)
+        else:
+            memory_cache.set(cache_key, value, remaining)
+        logging.info("Returning cached results for search query.")
+        return value
+
+    return await _coalesce(cache_key, lambda: _load(cache_key, compute))
+
+
+async def get_or_compute_many(
+    cache_keys: Dict[str, str],
+    family: str,
+    compute: Callable[[List[str]], Awaitable[Dict[str, bytes]]]
+) -> Dict[str, bytes]:
+    """
+    Return the cached values of many search terms, computing every miss in one call.
+
+    The lookups and popularity counts of all the terms go out in a single Redis
+    pipeline, and the values computed for the misses are stored in another.
+    Stale entries are recomputed along with the misses rather than in the
+    background, since the batch queries the database anyway. There is no
+    cross-worker lock: batches are meant for bulk jobs, not for hot keys.
+
+    Args:
+        cache_keys (Dict[str, str]): The cache key of each search term.
+        family (str): The cache key family, e.g. "search_employees".
+        compute (Callable[[List[str]], Awaitable[Dict[str, bytes]]]): Produces the
+            serialized value of each of the given terms.
+
+    Returns:
+        Dict[str, bytes]: The value of each term.
+    """
+    values: Dict[str, bytes] = {}
+    for term, cache_key in cache_keys.items():
+        value = memory_cache.get(cache_key)
+        if value is not None:
+            values[term] = value
+
+    pending = [term for term in cache_keys if term not in values]
+    if pending:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for term in pending:
+                pipe.get(cache_keys[term])
+            count_popular_searches(pipe, family, pending)
+            entries = (await pipe.execute())[:len(pending)]
+
+        missing = []
+        for term, entry in zip(pending, entries):
+            cache_stats[family]["hits" if entry is not None else "misses"] += 1
+            if entry is None:
+                missing.append(term)
+                continue
+            fresh_until, value = _decode_entry(entry)
+            remaining = fresh_until - time.time()
+            if remaining <= 0:
+                cache_stats[family]["stale"] = cache_stats[family].get("stale", 0) + 1
+                missing.append(term)
+            else:
+                values[term] = value
+                memory_cache.set(cache_keys[term], value, remaining)
+
+        if missing:
+            computed = await compute(missing)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for term, value in computed.items():
+                    pipe.setex(cache_keys[term], CACHE_EXPIRATION, _encode_entry(value))
+                await pipe.execute()
+            for term, value in computed.items():
+                memory_cache.set(cache_keys[term], value, CACHE_SOFT_TTL or None)
+            values.update(computed)
+
+    return values
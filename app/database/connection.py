@@ -1,9 +1,18 @@
-import psycopg2
-from psycopg2 import pool
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+import itertools
 import os
+from contextvars import ContextVar
 from dotenv import load_dotenv
-from typing import Optional, Any
+from typing import Dict, List, Optional
 import logging
+import time
+
+import redis.asyncio as redis
+
+from app.cache.redis import redis_client
+from app.metrics.prometheus import DB_POOL_WAIT
 
 # Configure logging
 logging.basicConfig(
@@ -14,7 +23,6 @@ logging.basicConfig(
 load_dotenv()
 
 # Database configuration
-connection_pool: Optional[pool.SimpleConnectionPool] = None
 DB_CONFIG: dict[str, Optional[str]] = {
     "dbname": os.getenv("DB_NAME"),
     "user": os.getenv("DB_USER"),
@@ -22,63 +30,218 @@ DB_CONFIG: dict[str, Optional[str]] = {
     "host": os.getenv("DB_HOST"),
     "port": os.getenv("DB_PORT"),
 }
+DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Comma separated "host[:port]" list of read replicas, sharing the primary's
+# database name and credentials. Empty: everything runs on the primary.
+DB_REPLICA_HOSTS: List[str] = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+# "least_busy" picks the replica with the fewest connections checked out, "round_robin" takes turns
+DB_REPLICA_SELECTION: str = os.getenv("DB_REPLICA_SELECTION", "least_busy")
+# After a write, reads of the same client go to the primary for this many
+# seconds, so they see the write despite the replication lag. 0 disables it.
+DB_READ_YOUR_WRITES_SECONDS: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "2"))
+READ_YOUR_WRITES_KEY = "read_your_writes"
+# Within the same window after a write to an entity, reads that fill its shared
+# cache also go to the primary, so no lagging page is cached under the new generation
+RECENT_WRITE_KEY = "recent_write"
+# plan_cache_mode of pooled connections. It applies to every prepared query, the
+# registered statements of app.database.statements as well as those psycopg
+# prepares after prepare_threshold runs, so it defaults to Postgres' own "auto":
+# generic plans are bad for skewed predicates such as the trigram suggestions.
+# "force_generic_plan" also skips re-planning the full-text searches, whose
+# generic cost estimate is much higher than their custom plans'.
+DB_PLAN_CACHE_MODE: str = os.getenv("DB_PLAN_CACHE_MODE", "auto")
+
+# The client the current request runs for, set by app.auth.jwt.get_current_principal
+current_client: ContextVar[Optional[str]] = ContextVar("current_client", default=None)
+
+
+async def configure_connection(connection: psycopg.AsyncConnection) -> None:
+    """
+    Set up a new pooled connection with DB_PLAN_CACHE_MODE.
+    """
+    await connection.execute("SELECT set_config('plan_cache_mode', %s, false);", (DB_PLAN_CACHE_MODE,))
+    await connection.commit()
+
 
-try:
-    connection_pool = psycopg2.pool.SimpleConnectionPool(
-        1, 20,  # Minimum and maximum connections
-        dbname=DB_CONFIG["dbname"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        host=DB_CONFIG["host"],
-        port=DB_CONFIG["port"]
+def create_pool(host: Optional[str] = None, port: Optional[str] = None) -> AsyncConnectionPool:
+    """
+    Create a connection pool to the primary, or to a replica when a host is given.
+
+    The pool is created closed: it needs a running event loop, so it is opened
+    from the application lifespan via open_pool().
+    """
+    config = {**DB_CONFIG, **({"host": host, "port": port} if host else {})}
+    return AsyncConnectionPool(
+        conninfo=make_conninfo(**{key: value for key, value in config.items() if value}),
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        timeout=DB_POOL_TIMEOUT,
+        configure=configure_connection,
+        open=False,
     )
 
-    if connection_pool:
-        logging.info("Connection pool created successfully!")
 
-except Exception as e:
-    logging.error("Error while creating the connection pool: %s", e)
+connection_pool: AsyncConnectionPool = create_pool()
+replica_pools: List[AsyncConnectionPool] = [
+    create_pool(*(replica.split(":", 1) if ":" in replica else (replica, DB_CONFIG["port"])))
+    for replica in DB_REPLICA_HOSTS
+]
+_replica_turns = itertools.cycle(replica_pools)
+# Pool of each checked out connection, by id, so it goes back where it came from
+_checked_out: Dict[int, AsyncConnectionPool] = {}
+
+
+async def open_pool() -> None:
+    """
+    Open the primary and replica pools and wait until the minimum number of connections is ready.
+    """
+    try:
+        for pool in (connection_pool, *replica_pools):
+            await pool.open(wait=True)
+        logging.info(f"Connection pool created successfully! ({len(replica_pools)} replicas)")
+    except Exception as e:
+        logging.error("Error while creating the connection pool: %s", e)
+        raise
+
+
+def pick_replica() -> AsyncConnectionPool:
+    """
+    Pick the replica pool for the next read, by DB_REPLICA_SELECTION.
+    """
+    if DB_REPLICA_SELECTION == "round_robin":
+        return next(_replica_turns)
+
+    def busy(pool: AsyncConnectionPool) -> int:
+        stats = pool.get_stats()
+        return stats.get("pool_size", 0) - stats.get("pool_available", 0) + stats.get("requests_waiting", 0)
+
+    return min(replica_pools, key=busy)
+
+
+def _recent_write_keys(client: Optional[str], entity: Optional[str]) -> List[str]:
+    keys = [f"{READ_YOUR_WRITES_KEY}:{client}"] if client else []
+    if entity:
+        keys.append(f"{RECENT_WRITE_KEY}:{entity}")
+    return keys
+
+
+async def remember_write(client: Optional[str] = None, entity: Optional[str] = None) -> None:
+    """
+    Send the reads of a client to the primary for DB_READ_YOUR_WRITES_SECONDS,
+    and those that fill the cache of the written entity, if given.
 
+    The window is kept in Redis, so it holds across workers. Called after the
+    write is committed, so a Redis failure is logged rather than raised.
 
-def get_connection() -> Optional[Any]:
+    Args:
+        client (Optional[str]): The client that wrote; defaults to the current request's client.
+        entity (Optional[str]): The entity whose cached reads were invalidated, e.g. "employees".
     """
-    Get a connection from the pool.
+    client = client or current_client.get()
+    keys = _recent_write_keys(client, entity)
+    if not replica_pools or not keys or DB_READ_YOUR_WRITES_SECONDS <= 0:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, 1, px=int(DB_READ_YOUR_WRITES_SECONDS * 1000))
+            await pipe.execute()
+    except redis.RedisError as e:
+        logging.error(f"Error recording a write of {client or entity}: {e}")
+
+
+async def reads_own_writes(client: Optional[str], entity: Optional[str] = None) -> bool:
+    """
+    Tell whether a client, or any client writing to the entity, wrote within the
+    read-your-writes window. When Redis cannot be reached this errs on the side
+    of the primary.
+    """
+    keys = _recent_write_keys(client, entity)
+    if not keys or DB_READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    try:
+        return bool(await redis_client.exists(*keys))
+    except redis.RedisError as e:
+        logging.error(f"Error checking recent writes of {client or entity}: {e}")
+        return True
+
+
+async def get_connection(
+    read_only: bool = False,
+    client: Optional[str] = None,
+    entity: Optional[str] = None
+) -> Optional[psycopg.AsyncConnection]:
+    """
+    Get a connection from the primary pool, or from a replica pool for reads.
+
+    Reads go to a replica unless none is configured or the client wrote within
+    the read-your-writes window. Reads that fill a shared cache pass the cached
+    entity: they also stay on the primary while anyone's write to it may not have
+    replicated, since their result is cached under the generation that write
+    started. If the replica cannot hand out a connection, the read falls back to
+    the primary.
+
+    Args:
+        read_only (bool): Whether the caller only reads and may use a replica.
+        client (Optional[str]): The client reading; defaults to the current request's client.
+        entity (Optional[str]): The entity whose shared cache the read fills, e.g. "employees".
 
     Returns:
-        Optional[Any]: A connection object from the pool or None if an error occurs.
+        Optional[psycopg.AsyncConnection]: A connection object from the pool or None if an error occurs.
     """
+    pool = connection_pool
+    if read_only and replica_pools and not await reads_own_writes(client or current_client.get(), entity):
+        pool = pick_replica()
+
     try:
-        connection = connection_pool.getconn() if connection_pool else None
-        if connection:
-            logging.info("Connection retrieved from pool")
+        started = time.perf_counter()
+        try:
+            connection = await pool.getconn()
+        except Exception as e:
+            if pool is connection_pool:
+                raise
+            logging.error("Error while getting a replica connection, using the primary: %s", e)
+            pool = connection_pool
+            connection = await pool.getconn()
+        DB_POOL_WAIT.observe(time.perf_counter() - started)
+        _checked_out[id(connection)] = pool
+        logging.debug("Connection retrieved from pool")
         return connection
     except Exception as e:
         logging.error("Error while getting connection: %s", e)
         return None
 
 
-def release_connection(connection: Optional[Any]) -> None:
+async def release_connection(connection: Optional[psycopg.AsyncConnection]) -> None:
     """
     Release a connection back to the pool.
 
+    Any transaction left open by a read-only query is rolled back first, so the
+    connection goes back to the pool idle.
+
     Args:
-        connection (Optional[Any]): The connection object to be released.
+        connection (Optional[psycopg.AsyncConnection]): The connection object to be released.
     """
     try:
-        if connection and connection_pool:
-            connection_pool.putconn(connection)
-            logging.info("Connection released back to pool")
+        if connection:
+            if not connection.closed and connection.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
+                await connection.rollback()
+            await _checked_out.pop(id(connection), connection_pool).putconn(connection)
+            logging.debug("Connection released back to pool")
     except Exception as e:
         logging.error("Error while releasing connection: %s", e)
 
 
-def close_all_connections() -> None:
+async def close_all_connections() -> None:
     """
-    Close all connections in the pool.
+    Close all connections in the primary and replica pools.
     """
     try:
-        if connection_pool:
-            connection_pool.closeall()
-            logging.info("All connections closed successfully!")
+        for pool in (connection_pool, *replica_pools):
+            await pool.close()
+        logging.info("All connections closed successfully!")
     except Exception as e:
         logging.error("Error while closing connections: %s", e)
@@ -1,8 +1,15 @@
-from typing import Optional, List, Dict, Union, Tuple
-from app.database.connection import get_connection, release_connection
-from app.cache.redis import redis_client, CACHE_EXPIRATION
-from app.schemas.employees import EmployeeCreate
-import json
+from typing import Optional, List, Dict, Union, Tuple, AsyncIterator
+from app.database.connection import get_connection, release_connection, remember_write
+from app.database.query_log import execute_query
+from app.database.statements import execute_statement, register_statement
+from app.database.totals import count_matches
+from app.metrics.prometheus import observe_db
+from app.cache.redis import versioned_cache_key, versioned_cache_keys, bump_generation, get_or_set_cached, SUGGEST_CACHE_EXPIRATION
+from app.cache.single_flight import get_or_compute, get_or_compute_many
+from app.database.pagination import encode_cursor, decode_cursor, encode_page, decode_page, encode_keyed_pages
+from app.database.export import stream_rows, encode_rows
+from app.schemas.employees import EmployeeCreate, EmployeeBulkRow, BIGINT_MAX
+import orjson
 import re
 import logging
 
@@ -12,151 +19,479 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
+# Columns of the employees export, in output order
+EMPLOYEE_EXPORT_COLUMNS = ("personal_id", "first_name", "last_name", "position", "government_id")
+# Must match the expression of employees_full_name_trgm_idx in scripts/load_data.py
+EMPLOYEE_FULL_NAME_SQL = "(COALESCE(first_name, '') || ' ' || COALESCE(last_name, ''))"
 
-def search_employees_in_db(
+
+async def search_employees_in_db(
     search: Optional[str] = None,
     skip: int = 0,
-    limit: int = 10
-) -> List[Dict[str, Union[int, str, None]]]:
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Union[int, str, None]]], Optional[str]]:
+    """
+    Search employees and return the page as dictionaries.
+    See search_employees_json for the search semantics.
+
+    Returns:
+        Tuple[List[Dict[str, Union[int, str, None]]], Optional[str]]: A list of employee
+            dictionaries and the cursor of the next page, or None on the last page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    body, next_cursor = await search_employees_json(search=search, skip=skip, limit=limit, cursor=cursor)
+    return orjson.loads(body), next_cursor
+
+
+async def search_employees_json(
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[bytes, Optional[str]]:
     """
     Search employees across multiple fields, including personal_id, using a single search term.
     Supports numeric and text-based searches. Results are sorted by similarity,
-    paginated, and cached for 1 minute.
+    paginated, and cached until the next employee write.
+
+    Pagination is keyset based: pass the returned cursor back to get the next page.
+    The sort key is (rank, personal_id) for searches and (first_name, personal_id)
+    otherwise, so deep pages cost the same as the first one. `skip` is kept for
+    backward compatibility and ignored when a cursor is given.
 
     Args:
         search (Optional[str]): The search term.
         skip (int): Number of records to skip for pagination.
         limit (int): Maximum number of records to return.
+        cursor (Optional[str]): Opaque cursor from a previous page.
+
+    The page is returned as the JSON array the API sends, straight from the
+    cache on a hit, so it never has to be decoded and re-encoded.
+
+    Returns:
+        Tuple[bytes, Optional[str]]: The employees as a JSON array shaped like
+            EmployeeResponse, and the cursor of the next page, or None on the last page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    if cursor:
+        skip = 0
+        after = decode_cursor(cursor, (float, int) if search else (str, int))
+    else:
+        after = None
+
+    cache_key = await versioned_cache_key("search_employees", "employees", f"{search}:{skip}:{limit}:{cursor}")
+    page = await get_or_compute(
+        cache_key,
+        "search_employees",
+        search,
+        lambda: fetch_employees_page(search, skip, limit, after),
+    )
+    return decode_page(page)
+
+
+def employee_search_sql(is_numeric: bool, keyset: bool) -> str:
+    """
+    Build the ranked employee search query.
+
+    search_vector is a stored, weighted tsvector (first/last name A, position B,
+    government_id C) backed by a GIN index, see scripts/load_data.py.
+    government_id is part of the vector, so numeric searches only need the
+    extra primary key match on personal_id.
+
+    Args:
+        is_numeric (bool): Whether the search term may also be a personal_id.
+        keyset (bool): Whether the page starts after a (rank, personal_id) cursor.
 
     Returns:
-        List[Dict[str, Union[int, str, None]]]: A list of employee dictionaries.
+        str: The query; its parameters are the term, the personal_id if numeric,
+            the cursor if keyset, the limit and the offset.
+    """
+    match_condition = "(personal_id = %s OR search_vector @@ ts_query)" if is_numeric else "search_vector @@ ts_query"
+    # ts_rank_cd returns a real; the cursor's rank is cast back to real so ties compare equal
+    keyset_condition = "AND (ts_rank_cd(search_vector, ts_query), personal_id) < (%s::real, %s)" if keyset else ""
+    return f"""
+        SELECT
+            personal_id,
+            first_name,
+            last_name,
+            position,
+            government_id,
+            ts_rank_cd(search_vector, ts_query) AS rank
+        FROM employees, plainto_tsquery('english', %s) AS ts_query
+        WHERE {match_condition} {keyset_condition}
+        ORDER BY rank DESC, personal_id DESC
+        LIMIT %s OFFSET %s;
+    """
+
+
+def employee_list_sql(keyset: bool) -> str:
+    """
+    Build the unfiltered employee listing, backed by the (COALESCE(first_name, ''), personal_id) index.
+    Its parameters are the cursor if keyset, the limit and the offset.
     """
-    cache_key = f"search_employees:{search}:{skip}:{limit}"
-    cached_results = redis_client.get(cache_key)
-    if cached_results:
-        logging.info("Returning cached results for search query.")
-        return json.loads(cached_results)
+    keyset_condition = "WHERE (COALESCE(first_name, ''), personal_id) > (%s, %s)" if keyset else ""
+    return f"""
+        SELECT
+            personal_id,
+            first_name,
+            last_name,
+            position,
+            government_id,
+            COALESCE(first_name, '') AS sort_name
+        FROM employees
+        {keyset_condition}
+        ORDER BY COALESCE(first_name, '') ASC, personal_id ASC
+        LIMIT %s OFFSET %s;
+    """
+
+
+# Hot statements by (is_numeric, keyset) and by keyset, prepared once per connection
+SEARCH_EMPLOYEES_STATEMENTS = {
+    (is_numeric, keyset): register_statement(
+        "search_employees" + ("_numeric" if is_numeric else "") + ("_after" if keyset else ""),
+        employee_search_sql(is_numeric, keyset),
+    )
+    for is_numeric in (False, True)
+    for keyset in (False, True)
+}
+LIST_EMPLOYEES_STATEMENTS = {
+    keyset: register_statement("list_employees" + ("_after" if keyset else ""), employee_list_sql(keyset))
+    for keyset in (False, True)
+}
+
+
+@observe_db
+async def fetch_employees_page(
+    search: Optional[str],
+    skip: int,
+    limit: int,
+    after: Optional[List[Union[int, float, str]]]
+) -> bytes:
+    """
+    Run the employee search query for one page, bypassing the cache.
+
+    Args:
+        search (Optional[str]): The search term.
+        skip (int): Number of records to skip for pagination.
+        limit (int): Maximum number of records to return.
+        after (Optional[List[Union[int, float, str]]]): Decoded keyset of the previous page.
 
-    connection = get_connection()
+    Returns:
+        bytes: The page serialized with encode_page.
+    """
+    connection = await get_connection(read_only=True, entity="employees")
     try:
-        cursor = connection.cursor()
+        db_cursor = connection.cursor()
 
         if search:
             search_clean = search.strip()
             ts_query = re.sub(r"[^\w\s]", "", search_clean)
-            is_numeric = search_clean.isdigit()
-
-            if is_numeric:
-                query = """
-                    SELECT
-                        personal_id,
-                        first_name,
-                        last_name,
-                        position,
-                        government_id,
-                        ts_rank_cd(
-                            setweight(to_tsvector('english', first_name), 'A') ||
-                            setweight(to_tsvector('english', last_name), 'A') ||
-                            setweight(to_tsvector('english', position), 'B') ||
-                            setweight(to_tsvector('english', COALESCE(government_id::TEXT, '')), 'C'),
-                            plainto_tsquery('english', %s)
-                        ) AS rank
-                    FROM employees
-                    WHERE
-                        personal_id::TEXT = %s OR
-                        government_id::TEXT = %s OR
-                        to_tsvector('english', first_name || ' ' || last_name || ' ' || position || ' ' || COALESCE(government_id::TEXT, ''))
-                        @@ plainto_tsquery('english', %s)
-                    ORDER BY rank DESC
-                    LIMIT %s OFFSET %s;
-                """
-                query_params = [ts_query, search_clean, search_clean, ts_query, limit, skip]
-            else:
-                query = """
-                    SELECT
-                        personal_id,
-                        first_name,
-                        last_name,
-                        position,
-                        government_id,
-                        ts_rank_cd(
-                            setweight(to_tsvector('english', first_name), 'A') ||
-                            setweight(to_tsvector('english', last_name), 'A') ||
-                            setweight(to_tsvector('english', position), 'B') ||
-                            setweight(to_tsvector('english', COALESCE(government_id::TEXT, '')), 'C'),
-                            plainto_tsquery('english', %s)
-                        ) AS rank
-                    FROM employees
-                    WHERE
-                        to_tsvector('english', first_name || ' ' || last_name || ' ' || position || ' ' || COALESCE(government_id::TEXT, ''))
-                        @@ plainto_tsquery('english', %s)
-                    ORDER BY rank DESC
-                    LIMIT %s OFFSET %s;
-                """
-                query_params = [ts_query, ts_query, limit, skip]
-
-            logging.info(f"Executing query: {query}")
-            logging.info(f"With parameters: {query_params}")
-            cursor.execute(query, query_params)
+            # IDs beyond BIGINT cannot match a personal_id, so they are searched as text
+            is_numeric = search_clean.isascii() and search_clean.isdigit() and int(search_clean) <= BIGINT_MAX
+
+            statement = SEARCH_EMPLOYEES_STATEMENTS[(is_numeric, bool(after))]
+            match_params = [int(search_clean)] if is_numeric else []
+            query_params = [ts_query, *match_params, *(after or []), limit + 1, skip]
         else:
-            query = """
-                SELECT
-                    personal_id,
-                    first_name,
-                    last_name,
-                    position,
-                    government_id
-                FROM employees
-                ORDER BY first_name ASC
-                LIMIT %s OFFSET %s;
-            """
-            query_params = [limit, skip]
+            statement = LIST_EMPLOYEES_STATEMENTS[bool(after)]
+            query_params = [*(after or []), limit + 1, skip]
 
-            logging.info(f"Executing default query: {query}")
-            logging.info(f"With parameters: {query_params}")
-            cursor.execute(query, query_params)
+        await execute_statement(db_cursor, statement, query_params, explain=True)
 
-        rows = cursor.fetchall()
-        logging.info(f"Raw rows returned: {rows}")
+        return encode_employee_page(await db_cursor.fetchall(), limit)
 
-        employees = []
+    except Exception as e:
+        logging.error(f"Error querying employees: {e}")
+        raise
+    finally:
+        await release_connection(connection)
 
-        for row in rows:
-            if len(row) < 5:
-                logging.warning(f"Skipping malformed row: {row}")
-                continue
 
-            employees.append({
-                "personal_id": row[0],
-                "first_name": row[1],
-                "last_name": row[2],
-                "position": row[3],
-                "government_id": row[4] if row[4] is not None else None
-            })
+def encode_employee_page(rows: List[Tuple], limit: int) -> bytes:
+    """
+    Serialize the rows of an employee search as a page with encode_page.
+
+    Args:
+        rows (List[Tuple]): Up to limit + 1 rows of (personal_id, first_name, last_name,
+            position, government_id, sort key); one row past the page tells whether
+            there is a next page.
+        limit (int): The page size.
+
+    Returns:
+        bytes: The page serialized with encode_page.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    employees = []
+
+    for row in rows:
+        if len(row) < 5:
+            logging.warning(f"Skipping malformed row: {row}")
+            continue
+
+        # Shaped like EmployeeResponse, so cached pages can be sent as is
+        employees.append({
+            "personal_id": row[0],
+            "first_name": row[1],
+            "last_name": row[2],
+            "position": row[3]
+        })
+
+    # The last column of each row is the sort key paired with personal_id
+    next_cursor = encode_cursor((rows[-1][5], rows[-1][0])) if rows and has_more else None
+
+    return encode_page(employees, next_cursor)
+
 
-        redis_client.setex(cache_key, CACHE_EXPIRATION, json.dumps(employees))
-        return employees
+# Top limit + 1 matches of every term, ranked like search_employees. Text terms
+# have no personal_id, so their primary key match is NULL and never true.
+SEARCH_EMPLOYEES_BATCH_SQL = """
+    SELECT
+        terms.term,
+        matches.personal_id,
+        matches.first_name,
+        matches.last_name,
+        matches.position,
+        matches.government_id,
+        matches.rank
+    FROM unnest(%s::text[], %s::text[], %s::bigint[]) AS terms(term, ts_term, match_id)
+    CROSS JOIN LATERAL (
+        SELECT
+            personal_id,
+            first_name,
+            last_name,
+            position,
+            government_id,
+            ts_rank_cd(search_vector, ts_query) AS rank
+        FROM employees, plainto_tsquery('english', terms.ts_term) AS ts_query
+        WHERE personal_id = terms.match_id OR search_vector @@ ts_query
+        ORDER BY rank DESC, personal_id DESC
+        LIMIT %s
+    ) AS matches;
+"""
+
+
+async def search_employees_batch_json(terms: List[str], limit: int = 10) -> bytes:
+    """
+    Search employees for many terms at once, with the semantics of search_employees_json.
+
+    Each term's results are the first page its own search would return, and
+    share that page's cache entry: cached terms are served from the cache,
+    and all the others are answered by a single query, then cached.
+
+    Args:
+        terms (List[str]): The search terms; duplicates are answered once.
+        limit (int): Maximum number of employees per term.
+
+    Returns:
+        bytes: A JSON object mapping each term to its employees, shaped like EmployeeResponse.
+    """
+    terms = list(dict.fromkeys(terms))
+    keys = await versioned_cache_keys("search_employees", "employees", (f"{term}:0:{limit}:None" for term in terms))
+    cache_keys = dict(zip(terms, keys))
+    pages = await get_or_compute_many(
+        cache_keys,
+        "search_employees",
+        lambda missing: fetch_employee_batch(missing, limit),
+    )
+    return encode_keyed_pages({term: decode_page(pages[term])[0] for term in terms})
+
+
+@observe_db
+async def fetch_employee_batch(terms: List[str], limit: int) -> Dict[str, bytes]:
+    """
+    Run the employee search for many terms in one query, bypassing the cache.
+
+    Args:
+        terms (List[str]): The search terms.
+        limit (int): Maximum number of employees per term.
+
+    Returns:
+        Dict[str, bytes]: The first page of each term, serialized with encode_page.
+    """
+    ts_terms, personal_ids = [], []
+    for term in terms:
+        search_clean = term.strip()
+        ts_terms.append(re.sub(r"[^\w\s]", "", search_clean))
+        # IDs beyond BIGINT cannot match a personal_id
+        is_id = search_clean.isascii() and search_clean.isdigit() and int(search_clean) <= BIGINT_MAX
+        personal_ids.append(int(search_clean) if is_id else None)
+
+    connection = await get_connection(read_only=True, entity="employees")
+    try:
+        db_cursor = connection.cursor()
+        await execute_query(
+            db_cursor,
+            "search_employees_batch",
+            SEARCH_EMPLOYEES_BATCH_SQL,
+            [terms, ts_terms, personal_ids, limit + 1],
+            explain=True
+        )
+
+        rows_by_term = {term: [] for term in terms}
+        for row in await db_cursor.fetchall():
+            rows_by_term[row[0]].append(row[1:])
+
+        return {term: encode_employee_page(rows, limit) for term, rows in rows_by_term.items()}
 
     except Exception as e:
-        logging.error(f"Error querying employees: {e}")
+        logging.error(f"Error batch querying employees: {e}")
         raise
     finally:
-        release_connection(connection)
+        await release_connection(connection)
+
+
+async def count_employees(search: Optional[str] = None) -> Tuple[int, bool]:
+    """
+    Count the employees matching a search, as search_employees_json matches them.
 
+    The total is exact up to SEARCH_TOTAL_EXACT_LIMIT and estimated from planner
+    statistics above it. It is cached per search term until the next employee write,
+    so paging through a search computes it once.
+
+    Args:
+        search (Optional[str]): The search term.
+
+    Returns:
+        Tuple[int, bool]: The total and whether it is exact.
+    """
+    cache_key = await versioned_cache_key("count_employees", "employees", f"{search}")
+    total = await get_or_compute(cache_key, "count_employees", search, lambda: fetch_employee_total(search))
+    return tuple(orjson.loads(total))
+
+
+@observe_db
+async def fetch_employee_total(search: Optional[str]) -> bytes:
+    """
+    Run the employee count, bypassing the cache.
+
+    Args:
+        search (Optional[str]): The search term.
 
-def create_employee_in_db(employeeCreate: EmployeeCreate) -> Dict[str, Union[int, str]]:
-    connection = get_connection()
+    Returns:
+        bytes: The total and whether it is exact, as a JSON array.
+    """
+    connection = await get_connection(read_only=True, entity="employees")
+    try:
+        db_cursor = connection.cursor()
+        from_where, params = "FROM employees", []
+        if search:
+            search_clean = search.strip()
+            ts_query = re.sub(r"[^\w\s]", "", search_clean)
+            # The term is inlined rather than joined, so the planner can estimate it
+            # from the search_vector statistics
+            match = "search_vector @@ plainto_tsquery('english', %s)"
+            if search_clean.isascii() and search_clean.isdigit() and int(search_clean) <= BIGINT_MAX:
+                from_where, params = f"FROM employees WHERE personal_id = %s OR {match}", [int(search_clean), ts_query]
+            else:
+                from_where, params = f"FROM employees WHERE {match}", [ts_query]
+
+        total, exact = await count_matches(db_cursor, "count_employees", from_where, params)
+        return orjson.dumps([total, exact])
+    except Exception as e:
+        logging.error(f"Error counting employees: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+
+async def suggest_employees(query: str, limit: int = 10) -> bytes:
+    """
+    Suggest employees whose full name matches a partial or misspelled query.
+
+    Matches use pg_trgm word similarity on "first_name last_name", backed by
+    the employees_full_name_trgm_idx GIN index. Names starting with the query
+    come first, then the closest matches. Results are cached briefly and
+    dropped on the next employee write.
+
+    Args:
+        query (str): The partial employee name typed so far.
+        limit (int): Maximum number of suggestions.
+
+    Returns:
+        bytes: The employees as a JSON array shaped like EmployeeResponse.
+    """
+    query = query.strip()
+    cache_key = await versioned_cache_key("suggest_employees", "employees", f"{query.lower()}:{limit}")
+    return await get_or_set_cached(
+        cache_key,
+        "suggest_employees",
+        lambda: fetch_employee_suggestions(query, limit),
+        SUGGEST_CACHE_EXPIRATION,
+    )
+
+
+@observe_db
+async def fetch_employee_suggestions(query: str, limit: int) -> bytes:
+    """
+    Run the employee suggestion query, bypassing the cache.
+
+    Args:
+        query (str): The partial employee name.
+        limit (int): Maximum number of suggestions.
+
+    Returns:
+        bytes: The employees as a JSON array.
+    """
+    connection = await get_connection(read_only=True, entity="employees")
+    try:
+        db_cursor = connection.cursor()
+        await execute_query(
+            db_cursor,
+            "suggest_employees",
+            f"""
+            SELECT personal_id, first_name, last_name, position
+            FROM employees
+            WHERE %(query)s <%% {EMPLOYEE_FULL_NAME_SQL}
+            ORDER BY
+                starts_with(lower({EMPLOYEE_FULL_NAME_SQL}), lower(%(query)s)) DESC,
+                word_similarity(%(query)s, {EMPLOYEE_FULL_NAME_SQL}) DESC,
+                personal_id DESC
+            LIMIT %(limit)s;
+            """,
+            {"query": query, "limit": limit},
+            explain=True
+        )
+        rows = await db_cursor.fetchall()
+        return orjson.dumps([
+            {
+                "personal_id": row[0],
+                "first_name": row[1],
+                "last_name": row[2],
+                "position": row[3]
+            }
+            for row in rows
+        ])
+    except Exception as e:
+        logging.error(f"Error suggesting employees: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+@observe_db
+async def create_employee_in_db(employeeCreate: EmployeeCreate) -> Dict[str, Union[int, str]]:
+    connection = await get_connection()
     try:
         cursor = connection.cursor()
-        cursor.execute(
+        await execute_query(
+            cursor,
+            "create_employee",
             """
             INSERT INTO employees (personal_id, first_name, last_name, position)
             VALUES (%s, %s, %s, %s) RETURNING personal_id, first_name, last_name, position;
             """,
             (employeeCreate.personal_id, employeeCreate.first_name, employeeCreate.last_name, employeeCreate.position)
         )
-        new_employee = cursor.fetchone()
-        connection.commit()
+        new_employee = await cursor.fetchone()
+        await connection.commit()
+        await remember_write(entity="employees")
+        await bump_generation("employees")
         logging.info(f"Employee created: {new_employee}")
         return {
             "personal_id": new_employee[0],
@@ -165,18 +500,143 @@ def create_employee_in_db(employeeCreate: EmployeeCreate) -> Dict[str, Union[int
             "position": new_employee[3]
         }
     except Exception as e:
-        connection.rollback()
+        await connection.rollback()
         logging.error(f"Error creating employee: {e}")
         raise
     finally:
-        release_connection(connection)
+        await release_connection(connection)
+
+
+@observe_db
+async def bulk_upsert_employees(
+    rows: AsyncIterator[Tuple[int, EmployeeBulkRow]],
+    max_errors: int = 1000
+) -> Dict[str, Union[int, List[Dict[str, Union[int, str]]]]]:
+    """
+    Load employees through COPY into a staging table and upsert them in one transaction.
+
+    The rows are streamed into the staging table as they are produced, so the
+    load never holds more than a COPY buffer in memory. When a personal_id
+    appears more than once the last line wins, and rows referencing an unknown
+    employer are rejected instead of failing the whole load.
+
+    Args:
+        rows (AsyncIterator[Tuple[int, EmployeeBulkRow]]): Line numbers and validated rows.
+        max_errors (int): Maximum number of rejected rows to describe.
+
+    Returns:
+        Dict[str, Union[int, List[Dict[str, Union[int, str]]]]]: The inserted, updated and
+            rejected counts, and the first rejected rows as {"line", "error"} dictionaries.
+
+    Raises:
+        Exception: If the load fails; nothing is written in that case.
+    """
+    connection = await get_connection()
+    try:
+        cursor = connection.cursor()
+
+        # Staging table, dropped with the transaction
+        await cursor.execute("""
+            CREATE TEMP TABLE tmp_bulk_employees (
+                line_no BIGINT NOT NULL,
+                personal_id BIGINT NOT NULL,
+                first_name VARCHAR(50),
+                last_name VARCHAR(50),
+                position VARCHAR(100),
+                government_id BIGINT
+            ) ON COMMIT DROP;
+        """)
+
+        staged = 0
+        async with cursor.copy("""
+            COPY tmp_bulk_employees (line_no, personal_id, first_name, last_name, position, government_id)
+            FROM STDIN
+        """) as copy:
+            async for line_no, row in rows:
+                await copy.write_row(
+                    (line_no, row.personal_id, row.first_name, row.last_name, row.position, row.government_id)
+                )
+                staged += 1
+        logging.info(f"Staged {staged} employees for the bulk load")
+
+        # Temp tables are not analyzed automatically
+        await cursor.execute("ANALYZE tmp_bulk_employees;")
+
+        rejected = 0
+        errors = []
+
+        await execute_query(cursor, "bulk_dedupe_employees", """
+            WITH removed AS (
+                DELETE FROM tmp_bulk_employees t
+                USING (
+                    SELECT line_no, row_number() OVER (PARTITION BY personal_id ORDER BY line_no DESC) AS occurrence
+                    FROM tmp_bulk_employees
+                ) d
+                WHERE t.line_no = d.line_no AND d.occurrence > 1
+                RETURNING t.line_no, t.personal_id
+            )
+            SELECT line_no, personal_id, count(*) OVER () FROM removed ORDER BY line_no LIMIT %s;
+        """, (max_errors,))
+        for line_no, personal_id, total in await cursor.fetchall():
+            rejected = total
+            errors.append({"line": line_no, "error": f"Duplicate personal_id {personal_id}, superseded by a later line"})
+
+        await execute_query(cursor, "bulk_reject_unknown_employers", """
+            WITH removed AS (
+                DELETE FROM tmp_bulk_employees t
+                WHERE t.government_id IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM employers e WHERE e.government_id = t.government_id)
+                RETURNING t.line_no, t.government_id
+            )
+            SELECT line_no, government_id, count(*) OVER () FROM removed ORDER BY line_no LIMIT %s;
+        """, (max_errors,))
+        unknown_employers = await cursor.fetchall()
+        if unknown_employers:
+            rejected += unknown_employers[0][2]
+        for line_no, government_id, _ in unknown_employers:
+            errors.append({"line": line_no, "error": f"Employer with government ID {government_id} not found"})
+
+        await execute_query(cursor, "bulk_upsert_employees", """
+            WITH upserted AS (
+                INSERT INTO employees (personal_id, first_name, last_name, position, government_id)
+                SELECT personal_id, first_name, last_name, position, government_id FROM tmp_bulk_employees
+                ON CONFLICT (personal_id)
+                DO UPDATE SET
+                    first_name = EXCLUDED.first_name,
+                    last_name = EXCLUDED.last_name,
+                    position = EXCLUDED.position,
+                    government_id = EXCLUDED.government_id
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted;
+        """)
+        inserted, updated = await cursor.fetchone()
+
+        await connection.commit()
+        await remember_write(entity="employees" if inserted or updated else None)
+        if inserted or updated:
+            await bump_generation("employees")
+        logging.info(f"Bulk load finished: {inserted} inserted, {updated} updated, {rejected} rejected")
+        return {
+            "inserted": inserted,
+            "updated": updated,
+            "rejected": rejected,
+            "errors": errors[:max_errors]
+        }
+    except Exception as e:
+        await connection.rollback()
+        logging.error(f"Error bulk loading employees: {e}")
+        raise
+    finally:
+        await release_connection(connection)
 
 
-def attach_employee_to_employer(
+@observe_db
+async def attach_employee_to_employer(
     employee_personal_id: int,
     employer_government_id: int
 ) -> Tuple[Optional[Dict[str, Optional[str]]], Optional[str]]:
-    connection = get_connection()
+    connection = await get_connection()
     try:
         cursor = connection.cursor()
 
@@ -184,38 +644,133 @@ def attach_employee_to_employer(
             UPDATE employees
             SET government_id = %s
             WHERE personal_id = %s
-            RETURNING personal_id;
+            RETURNING personal_id, first_name, last_name, position, government_id;
         """
-        cursor.execute(update_query, (employer_government_id, employee_personal_id))
-        updated_employee_id = cursor.fetchone()
+        await execute_query(cursor, "attach_employee", update_query, (employer_government_id, employee_personal_id))
+        updated_employee = await cursor.fetchone()
 
-        if not updated_employee_id:
+        if not updated_employee:
             return None, f"Employee with personal ID {employee_personal_id} not found"
 
-        fetch_query = """
-            SELECT personal_id, first_name, last_name, position, government_id
-            FROM employees
-            WHERE personal_id = %s;
-        """
-        cursor.execute(fetch_query, (employee_personal_id,))
-        updated_employee = cursor.fetchone()
-
-        connection.commit()
-
-        if updated_employee:
-            return {
-                "personal_id": updated_employee[0],
-                "first_name": updated_employee[1],
-                "last_name": updated_employee[2],
-                "position": updated_employee[3],
-                "government_id": updated_employee[4]
-            }, None
+        await connection.commit()
+        await remember_write(entity="employees")
+        await bump_generation("employees")
 
-        return None, "Error retrieving updated employee data"
+        return {
+            "personal_id": updated_employee[0],
+            "first_name": updated_employee[1],
+            "last_name": updated_employee[2],
+            "position": updated_employee[3],
+            "government_id": updated_employee[4]
+        }, None
 
     except Exception as e:
-        connection.rollback()
+        await connection.rollback()
         logging.error(f"Error attaching employee to employer: {e}")
         return None, str(e)
     finally:
-        release_connection(connection)
+        await release_connection(connection)
+
+
+@observe_db
+async def attach_employees_to_employers(
+    attachments: List[Tuple[int, int]]
+) -> Dict[str, Union[int, List[int]]]:
+    """
+    Attach many employees to employers in a single set-based statement.
+
+    Pairs whose employee or employer does not exist are skipped and reported;
+    the others are attached. When a personal_id appears more than once the
+    last pair wins.
+
+    Args:
+        attachments (List[Tuple[int, int]]): (personal_id, government_id) pairs.
+
+    Returns:
+        Dict[str, Union[int, List[int]]]: The number of attached employees, the personal
+            IDs that were not found and the government IDs of unknown employers.
+
+    Raises:
+        Exception: If the update fails; nothing is written in that case.
+    """
+    connection = await get_connection()
+    try:
+        cursor = connection.cursor()
+        await execute_query(
+            cursor,
+            "attach_employees",
+            """
+            WITH pairs AS (
+                SELECT DISTINCT ON (personal_id) personal_id, government_id
+                FROM unnest(%s::BIGINT[], %s::BIGINT[]) WITH ORDINALITY AS p(personal_id, government_id, ord)
+                ORDER BY personal_id, ord DESC
+            ),
+            checked AS (
+                SELECT
+                    p.personal_id,
+                    p.government_id,
+                    EXISTS (SELECT 1 FROM employees e WHERE e.personal_id = p.personal_id) AS employee_found,
+                    EXISTS (SELECT 1 FROM employers r WHERE r.government_id = p.government_id) AS employer_found
+                FROM pairs p
+            ),
+            updated AS (
+                UPDATE employees e
+                SET government_id = c.government_id
+                FROM checked c
+                WHERE e.personal_id = c.personal_id AND c.employer_found
+                RETURNING e.personal_id
+            )
+            SELECT
+                (SELECT count(*) FROM updated),
+                COALESCE(array_agg(personal_id ORDER BY personal_id) FILTER (WHERE NOT employee_found), '{}'),
+                COALESCE(
+                    array_agg(DISTINCT government_id ORDER BY government_id) FILTER (WHERE NOT employer_found), '{}'
+                )
+            FROM checked;
+            """,
+            ([pair[0] for pair in attachments], [pair[1] for pair in attachments])
+        )
+        attached, missing_personal_ids, unknown_government_ids = await cursor.fetchone()
+
+        await connection.commit()
+        await remember_write(entity="employees" if attached else None)
+        if attached:
+            await bump_generation("employees")
+
+        logging.info(
+            f"Bulk attach finished: {attached} attached, {len(missing_personal_ids)} missing employees, "
+            f"{len(unknown_government_ids)} unknown employers"
+        )
+        return {
+            "attached": attached,
+            "missing_personal_ids": missing_personal_ids,
+            "unknown_government_ids": unknown_government_ids
+        }
+    except Exception as e:
+        await connection.rollback()
+        logging.error(f"Error bulk attaching employees to employers: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+
+def export_employees(export_format: str, government_id: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Stream all employees as NDJSON or CSV, ordered by personal_id.
+
+    Args:
+        export_format (str): "ndjson" or "csv".
+        government_id (Optional[int]): Only export employees of this employer.
+
+    Returns:
+        AsyncIterator[bytes]: The encoded export, one chunk per batch.
+    """
+    where_clause = "WHERE government_id = %s" if government_id is not None else ""
+    params = (government_id,) if government_id is not None else ()
+    query = f"""
+        SELECT {', '.join(EMPLOYEE_EXPORT_COLUMNS)}
+        FROM employees
+        {where_clause}
+        ORDER BY personal_id;
+    """
+    return encode_rows(stream_rows("export_employees", query, params), EMPLOYEE_EXPORT_COLUMNS, export_format)
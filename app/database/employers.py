@@ -1,7 +1,15 @@
-from typing import List, Dict, Optional, Union
-from app.database.connection import get_connection, release_connection
-from app.cache.redis import redis_client
-import json
+from typing import List, Dict, Optional, Union, Tuple, AsyncIterator
+from app.database.connection import get_connection, release_connection, remember_write
+from app.database.query_log import execute_query
+from app.database.statements import execute_statement, register_statement
+from app.database.totals import count_matches
+from app.metrics.prometheus import observe_db
+from app.cache.redis import versioned_cache_key, versioned_cache_keys, bump_generation, get_or_set_cached, SUGGEST_CACHE_EXPIRATION
+from app.cache.single_flight import get_or_compute, get_or_compute_many
+from app.database.pagination import encode_cursor, decode_cursor, encode_page, decode_page, encode_keyed_pages
+from app.database.export import stream_rows, encode_rows
+from app.schemas.employees import BIGINT_MAX
+import orjson
 import logging
 
 # Configure logging
@@ -10,7 +18,8 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
-CACHE_EXPIRATION = 60
+# Columns of the employers export, in output order
+EMPLOYER_EXPORT_COLUMNS = ("government_id", "employer_name")
 
 
 class Employer:
@@ -19,7 +28,8 @@ class Employer:
         self.government_id = government_id
 
 
-def create_employer_in_db(employer: Employer) -> Dict[str, Union[int, str]]:
+@observe_db
+async def create_employer_in_db(employer: Employer) -> Dict[str, Union[int, str]]:
     """
     Insert a new employer into the database.
 
@@ -29,10 +39,12 @@ def create_employer_in_db(employer: Employer) -> Dict[str, Union[int, str]]:
     Returns:
         Dict[str, Union[int, str]]: A dictionary containing the created employer's details.
     """
-    connection = get_connection()
+    connection = await get_connection()
     try:
         cursor = connection.cursor()
-        cursor.execute(
+        await execute_query(
+            cursor,
+            "create_employer",
             """
             INSERT INTO employers (employer_name, government_id)
             VALUES (%s, %s)
@@ -40,101 +52,557 @@ def create_employer_in_db(employer: Employer) -> Dict[str, Union[int, str]]:
             """,
             (employer.employer_name, employer.government_id),
         )
-        new_employer = cursor.fetchone()
-        connection.commit()
+        new_employer = await cursor.fetchone()
+        await connection.commit()
+        await remember_write(entity="employers")
+        await bump_generation("employers")
         logging.info(f"Employer created: {new_employer}")
         return {"employer_name": new_employer[0], "government_id": new_employer[1]}
     except Exception as e:
         logging.error(f"Error creating employer: {e}")
         raise
     finally:
-        release_connection(connection)
+        await release_connection(connection)
 
 
-def search_employers(search: Optional[str] = None, skip: int = 0, limit: int = 10) -> List[Dict[str, Union[int, str]]]:
+async def search_employers(
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Union[int, str]]], Optional[str]]:
+    """
+    Search employers and return the page as dictionaries.
+    See search_employers_json for the search semantics.
+
+    Returns:
+        Tuple[List[Dict[str, Union[int, str]]], Optional[str]]: A list of employer
+            dictionaries and the cursor of the next page, or None on the last page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    body, next_cursor = await search_employers_json(search=search, skip=skip, limit=limit, cursor=cursor)
+    return orjson.loads(body), next_cursor
+
+
+async def search_employers_json(
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[bytes, Optional[str]]:
     """
     Search employers by name or government_id using a single search term.
-    Supports full-text and numeric searches. Results are paginated and cached.
+    Supports full-text and numeric searches. Results are paginated and cached
+    until the next employer write.
+
+    Results are ordered by (employer_name, government_id) and paginated with a
+    keyset cursor backed by an index on those columns. `skip` is kept for
+    backward compatibility and ignored when a cursor is given.
 
     Args:
         search (Optional[str]): The search term.
         skip (int): Number of records to skip for pagination.
         limit (int): Maximum number of records to return.
+        cursor (Optional[str]): Opaque cursor from a previous page.
+
+    The page is returned as the JSON array the API sends, straight from the
+    cache on a hit, so it never has to be decoded and re-encoded.
+
+    Returns:
+        Tuple[bytes, Optional[str]]: The employers as a JSON array shaped like
+            EmployerResponse, and the cursor of the next page, or None on the last page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    if cursor:
+        skip = 0
+        after = decode_cursor(cursor, (str, int))
+    else:
+        after = None
+
+    cache_key = await versioned_cache_key("search_employers", "employers", f"{search}:{skip}:{limit}:{cursor}")
+    page = await get_or_compute(
+        cache_key,
+        "search_employers",
+        search,
+        lambda: fetch_employers_page(search, skip, limit, after),
+    )
+    return decode_page(page)
+
+
+# Search condition by match, shared by the search and its count. search_vector is
+# the stored tsvector of employer_name, backed by a GIN index, see scripts/load_data.py.
+EMPLOYER_MATCH_CONDITIONS = {
+    "numeric": "government_id = %s",
+    "text": "search_vector @@ plainto_tsquery('english', %s)",
+}
+
+
+def employer_search_sql(match: Optional[str], keyset: bool) -> str:
+    """
+    Build the employer search query, ordered by (employer_name, government_id).
+
+    Args:
+        match (Optional[str]): "numeric" to match a government ID, "text" to match
+            the name by full-text search, or None to list every employer.
+        keyset (bool): Whether the page starts after an (employer_name, government_id) cursor.
 
     Returns:
-        List[Dict[str, Union[int, str]]]: A list of employer dictionaries.
+        str: The query; its parameters are the search term if any, the cursor if
+            keyset, the limit and the offset.
     """
-    cache_key = f"search_employers:{search}:{skip}:{limit}"
+    conditions = [EMPLOYER_MATCH_CONDITIONS[match]] if match else []
+    if keyset:
+        conditions.append("(employer_name, government_id) > (%s, %s)")
 
-    cached_results = redis_client.get(cache_key)
-    if cached_results:
-        logging.info("Returning cached results for search query.")
-        return json.loads(cached_results)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"""
+        SELECT employer_name, government_id
+        FROM employers
+        {where_clause}
+        ORDER BY employer_name ASC, government_id ASC
+        LIMIT %s OFFSET %s;
+    """
 
-    connection = get_connection()
+
+# Hot statements by (match, keyset), prepared once per connection
+SEARCH_EMPLOYERS_STATEMENTS = {
+    (match, keyset): register_statement(
+        {None: "list_employers", "numeric": "search_employers_by_id", "text": "search_employers"}[match]
+        + ("_after" if keyset else ""),
+        employer_search_sql(match, keyset),
+    )
+    for match in (None, "numeric", "text")
+    for keyset in (False, True)
+}
+
+
+@observe_db
+async def fetch_employers_page(
+    search: Optional[str],
+    skip: int,
+    limit: int,
+    after: Optional[List[Union[int, str]]]
+) -> bytes:
+    """
+    Run the employer search query for one page, bypassing the cache.
+
+    Args:
+        search (Optional[str]): The search term.
+        skip (int): Number of records to skip for pagination.
+        limit (int): Maximum number of records to return.
+        after (Optional[List[Union[int, str]]]): Decoded keyset of the previous page.
+
+    Returns:
+        bytes: The page serialized with encode_page.
+    """
+    connection = await get_connection(read_only=True, entity="employers")
     try:
-        cursor = connection.cursor()
+        db_cursor = connection.cursor()
+
+        match = None
+        query_params = []
 
         if search:
             search_clean = search.strip()
-            is_numeric = search_clean.isdigit()
-
-            if is_numeric:
-                query = """
-                SELECT employer_name, government_id
-                FROM employers
-                WHERE government_id::TEXT = %s
-                LIMIT %s OFFSET %s;
-                """
-                query_params = [search_clean, limit, skip]
-            else:
-                query = """
-                SELECT employer_name, government_id
-                FROM employers
-                WHERE to_tsvector('english', employer_name)
-                      @@ plainto_tsquery('english', %s)
-                LIMIT %s OFFSET %s;
-                """
-                query_params = [search_clean, limit, skip]
-
-            logging.info(f"Executing query: {query}")
-            logging.info(f"With parameters: {query_params}")
-            cursor.execute(query, query_params)
-        else:
-            query = """
+            match = "numeric" if search_clean.isascii() and search_clean.isdigit() else "text"
+            if match == "numeric" and int(search_clean) > BIGINT_MAX:
+                # IDs beyond BIGINT cannot match a government_id
+                return encode_employer_page([], limit)
+            query_params.append(int(search_clean) if match == "numeric" else search_clean)
+
+        if after:
+            query_params.extend(after)
+        query_params.extend([limit + 1, skip])
+
+        await execute_statement(db_cursor, SEARCH_EMPLOYERS_STATEMENTS[(match, bool(after))], query_params, explain=True)
+
+        return encode_employer_page(await db_cursor.fetchall(), limit)
+
+    except Exception as e:
+        logging.error(f"Error querying employers: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+
+def encode_employer_page(rows: List[Tuple], limit: int) -> bytes:
+    """
+    Serialize up to limit + 1 (employer_name, government_id) rows as a page with encode_page.
+    The row past the page only tells whether there is a next page.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    employers = [
+        {
+            "employer_name": row[0],
+            "government_id": row[1]
+        }
+        for row in rows
+    ]
+
+    next_cursor = encode_cursor(rows[-1]) if rows and has_more else None
+
+    return encode_page(employers, next_cursor)
+
+
+# Top limit + 1 matches of every term, ordered like search_employers. Text and
+# numeric terms are matched in separate arms, so IDs are looked up by primary key.
+SEARCH_EMPLOYERS_BATCH_SQL = """
+    SELECT terms.term, matches.employer_name, matches.government_id
+    FROM unnest(%s::text[], %s::text[]) AS terms(term, search_term)
+    CROSS JOIN LATERAL (
+        SELECT employer_name, government_id
+        FROM employers
+        WHERE search_vector @@ plainto_tsquery('english', terms.search_term)
+        ORDER BY employer_name ASC, government_id ASC
+        LIMIT %s
+    ) AS matches
+    UNION ALL
+    SELECT terms.term, matches.employer_name, matches.government_id
+    FROM unnest(%s::text[], %s::bigint[]) AS terms(term, match_id)
+    CROSS JOIN LATERAL (
+        SELECT employer_name, government_id
+        FROM employers
+        WHERE government_id = terms.match_id
+        ORDER BY employer_name ASC, government_id ASC
+        LIMIT %s
+    ) AS matches;
+"""
+
+
+async def search_employers_batch_json(terms: List[str], limit: int = 10) -> bytes:
+    """
+    Search employers for many terms at once, with the semantics of search_employers_json.
+
+    Each term's results are the first page its own search would return, and
+    share that page's cache entry: cached terms are served from the cache,
+    and all the others are answered by a single query, then cached.
+
+    Args:
+        terms (List[str]): The search terms; duplicates are answered once.
+        limit (int): Maximum number of employers per term.
+
+    Returns:
+        bytes: A JSON object mapping each term to its employers, shaped like EmployerResponse.
+    """
+    terms = list(dict.fromkeys(terms))
+    keys = await versioned_cache_keys("search_employers", "employers", (f"{term}:0:{limit}:None" for term in terms))
+    cache_keys = dict(zip(terms, keys))
+    pages = await get_or_compute_many(
+        cache_keys,
+        "search_employers",
+        lambda missing: fetch_employer_batch(missing, limit),
+    )
+    return encode_keyed_pages({term: decode_page(pages[term])[0] for term in terms})
+
+
+@observe_db
+async def fetch_employer_batch(terms: List[str], limit: int) -> Dict[str, bytes]:
+    """
+    Run the employer search for many terms in one query, bypassing the cache.
+
+    Args:
+        terms (List[str]): The search terms.
+        limit (int): Maximum number of employers per term.
+
+    Returns:
+        Dict[str, bytes]: The first page of each term, serialized with encode_page.
+    """
+    text_terms, search_terms, numeric_terms, government_ids = [], [], [], []
+    for term in terms:
+        search_clean = term.strip()
+        if not (search_clean.isascii() and search_clean.isdigit()):
+            text_terms.append(term)
+            search_terms.append(search_clean)
+        elif int(search_clean) <= BIGINT_MAX:
+            # IDs beyond BIGINT cannot match a government_id
+            numeric_terms.append(term)
+            government_ids.append(int(search_clean))
+
+    connection = await get_connection(read_only=True, entity="employers")
+    try:
+        db_cursor = connection.cursor()
+        await execute_query(
+            db_cursor,
+            "search_employers_batch",
+            SEARCH_EMPLOYERS_BATCH_SQL,
+            [text_terms, search_terms, limit + 1, numeric_terms, government_ids, limit + 1],
+            explain=True
+        )
+
+        rows_by_term = {term: [] for term in terms}
+        for row in await db_cursor.fetchall():
+            rows_by_term[row[0]].append(row[1:])
+
+        return {term: encode_employer_page(rows, limit) for term, rows in rows_by_term.items()}
+
+    except Exception as e:
+        logging.error(f"Error batch querying employers: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+
+async def count_employers(search: Optional[str] = None) -> Tuple[int, bool]:
+    """
+    Count the employers matching a search, as search_employers_json matches them.
+
+    The total is exact up to SEARCH_TOTAL_EXACT_LIMIT and estimated from planner
+    statistics above it. It is cached per search term until the next employer write.
+
+    Args:
+        search (Optional[str]): The search term.
+
+    Returns:
+        Tuple[int, bool]: The total and whether it is exact.
+    """
+    cache_key = await versioned_cache_key("count_employers", "employers", f"{search}")
+    total = await get_or_compute(cache_key, "count_employers", search, lambda: fetch_employer_total(search))
+    return tuple(orjson.loads(total))
+
+
+@observe_db
+async def fetch_employer_total(search: Optional[str]) -> bytes:
+    """
+    Run the employer count, bypassing the cache.
+
+    Args:
+        search (Optional[str]): The search term.
+
+    Returns:
+        bytes: The total and whether it is exact, as a JSON array.
+    """
+    connection = await get_connection(read_only=True, entity="employers")
+    try:
+        db_cursor = connection.cursor()
+        from_where, params = "FROM employers", []
+        if search:
+            search_clean = search.strip()
+            match = "numeric" if search_clean.isascii() and search_clean.isdigit() else "text"
+            if match == "numeric" and int(search_clean) > BIGINT_MAX:
+                return orjson.dumps([0, True])
+            from_where = f"FROM employers WHERE {EMPLOYER_MATCH_CONDITIONS[match]}"
+            params = [int(search_clean) if match == "numeric" else search_clean]
+
+        total, exact = await count_matches(db_cursor, "count_employers", from_where, params)
+        return orjson.dumps([total, exact])
+    except Exception as e:
+        logging.error(f"Error counting employers: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+
+async def suggest_employers(query: str, limit: int = 10) -> bytes:
+    """
+    Suggest employers whose name matches a partial or misspelled query.
+
+    Matches use pg_trgm word similarity, backed by the employers_name_trgm_idx
+    GIN index. Names starting with the query come first, then the closest
+    matches. Results are cached briefly and dropped on the next employer write.
+
+    Args:
+        query (str): The partial employer name typed so far.
+        limit (int): Maximum number of suggestions.
+
+    Returns:
+        bytes: The employers as a JSON array shaped like EmployerResponse.
+    """
+    query = query.strip()
+    cache_key = await versioned_cache_key("suggest_employers", "employers", f"{query.lower()}:{limit}")
+    return await get_or_set_cached(
+        cache_key,
+        "suggest_employers",
+        lambda: fetch_employer_suggestions(query, limit),
+        SUGGEST_CACHE_EXPIRATION,
+    )
+
+
+@observe_db
+async def fetch_employer_suggestions(query: str, limit: int) -> bytes:
+    """
+    Run the employer suggestion query, bypassing the cache.
+
+    Args:
+        query (str): The partial employer name.
+        limit (int): Maximum number of suggestions.
+
+    Returns:
+        bytes: The employers as a JSON array.
+    """
+    connection = await get_connection(read_only=True, entity="employers")
+    try:
+        db_cursor = connection.cursor()
+        await execute_query(
+            db_cursor,
+            "suggest_employers",
+            """
             SELECT employer_name, government_id
             FROM employers
-            ORDER BY employer_name ASC
-            LIMIT %s OFFSET %s;
-            """
-            query_params = [limit, skip]
+            WHERE %(query)s <%% employer_name
+            ORDER BY
+                starts_with(lower(employer_name), lower(%(query)s)) DESC,
+                word_similarity(%(query)s, employer_name) DESC,
+                employer_name ASC,
+                government_id ASC
+            LIMIT %(limit)s;
+            """,
+            {"query": query, "limit": limit},
+            explain=True
+        )
+        rows = await db_cursor.fetchall()
+        return orjson.dumps([{"employer_name": row[0], "government_id": row[1]} for row in rows])
+    except Exception as e:
+        logging.error(f"Error suggesting employers: {e}")
+        raise
+    finally:
+        await release_connection(connection)
 
-            logging.info(f"Executing default query: {query}")
-            logging.info(f"With parameters: {query_params}")
-            cursor.execute(query, query_params)
+@observe_db
+async def get_employer_roster(
+    government_id: int,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Optional[Tuple[Dict[str, Union[int, str, List]], Optional[str]]]:
+    """
+    Retrieve an employer with its headcount and one page of its employees.
 
-        rows = cursor.fetchall()
-        logging.info(f"Raw rows returned: {rows}")
+    Employees are ordered by personal_id and paginated with a keyset cursor
+    over the employees_government_id_keyset_idx index.
 
-        employers = [
-            {
-                "employer_name": row[0],
-                "government_id": row[1]
-            }
-            for row in rows
-        ]
+    Args:
+        government_id (int): The employer's government ID.
+        limit (int): Maximum number of employees to return.
+        cursor (Optional[str]): Opaque cursor from a previous page.
 
-        redis_client.setex(cache_key, CACHE_EXPIRATION, json.dumps(employers))
-        return employers
+    Returns:
+        Optional[Tuple[Dict[str, Union[int, str, List]], Optional[str]]]: The employer with
+            its employees, and the cursor of the next page, or None if the employer does not exist.
 
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    after = decode_cursor(cursor, (int,)) if cursor else None
+
+    connection = await get_connection(read_only=True)
+    try:
+        db_cursor = connection.cursor()
+        await execute_query(
+            db_cursor,
+            "get_employer",
+            "SELECT employer_name, government_id, headcount FROM employers WHERE government_id = %s;",
+            (government_id,),
+            explain=True
+        )
+        employer = await db_cursor.fetchone()
+        if not employer:
+            return None
+
+        keyset = "AND personal_id > %s" if after else ""
+        await execute_query(
+            db_cursor,
+            "employer_roster",
+            f"""
+            SELECT personal_id, first_name, last_name, position
+            FROM employees
+            WHERE government_id = %s {keyset}
+            ORDER BY personal_id ASC
+            LIMIT %s;
+            """,
+            (government_id, *(after or ()), limit + 1),
+            explain=True
+        )
+        # One row past the page tells whether there is a next page
+        rows = await db_cursor.fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = encode_cursor((rows[-1][0],)) if rows and has_more else None
+        return {
+            "employer_name": employer[0],
+            "government_id": employer[1],
+            "headcount": employer[2],
+            "employees": [
+                {
+                    "personal_id": row[0],
+                    "first_name": row[1],
+                    "last_name": row[2],
+                    "position": row[3]
+                }
+                for row in rows
+            ]
+        }, next_cursor
     except Exception as e:
-        logging.error(f"Error querying employers: {e}")
+        logging.error(f"Error retrieving employer roster: {e}")
         raise
     finally:
-        release_connection(connection)
+        await release_connection(connection)
+
+
+@observe_db
+async def list_employers_by_headcount(
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Union[int, str]]], Optional[str]]:
+    """
+    List employers from the largest to the smallest headcount.
+
+    The headcount is maintained by triggers on employees, so this is a keyset
+    scan of the employers_headcount_keyset_idx index rather than a count.
+
+    Args:
+        limit (int): Maximum number of employers to return.
+        cursor (Optional[str]): Opaque cursor from a previous page.
+
+    Returns:
+        Tuple[List[Dict[str, Union[int, str]]], Optional[str]]: The employers with their
+            headcount, and the cursor of the next page, or None on the last page.
 
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    after = decode_cursor(cursor, (int, int)) if cursor else None
 
-def get_employer_by_name(employer_name: str) -> Optional[Dict[str, int]]:
+    connection = await get_connection(read_only=True)
+    try:
+        db_cursor = connection.cursor()
+        keyset = "WHERE (headcount, government_id) < (%s, %s)" if after else ""
+        await execute_query(
+            db_cursor,
+            "employers_by_headcount",
+            f"""
+            SELECT employer_name, government_id, headcount
+            FROM employers
+            {keyset}
+            ORDER BY headcount DESC, government_id DESC
+            LIMIT %s;
+            """,
+            (*(after or ()), limit + 1),
+            explain=True
+        )
+        # One row past the page tells whether there is a next page
+        rows = await db_cursor.fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = encode_cursor((rows[-1][2], rows[-1][1])) if rows and has_more else None
+        return [
+            {"employer_name": row[0], "government_id": row[1], "headcount": row[2]}
+            for row in rows
+        ], next_cursor
+    except Exception as e:
+        logging.error(f"Error listing employers by headcount: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+@observe_db
+async def get_employer_by_name(employer_name: str) -> Optional[Dict[str, int]]:
     """
     Retrieve an employer by name.
 
@@ -144,16 +612,38 @@ def get_employer_by_name(employer_name: str) -> Optional[Dict[str, int]]:
     Returns:
         Optional[Dict[str, int]]: A dictionary with the employer ID if found, otherwise None.
     """
-    connection = get_connection()
+    connection = await get_connection()
     try:
         cursor = connection.cursor()
         query = "SELECT id FROM employers WHERE employer_name = %s;"
-        cursor.execute(query, (employer_name,))
-        employer = cursor.fetchone()
+        await execute_query(cursor, "get_employer_by_name", query, (employer_name,), explain=True)
+        employer = await cursor.fetchone()
         logging.info(f"Employer found: {employer}" if employer else "Employer not found.")
         return {"id": employer[0]} if employer else None
     except Exception as e:
         logging.error(f"Error retrieving employer by name: {e}")
         raise
     finally:
-        release_connection(connection)
+        await release_connection(connection)
+
+
+def export_employers(export_format: str, government_id: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Stream all employers as NDJSON or CSV, ordered by government_id.
+
+    Args:
+        export_format (str): "ndjson" or "csv".
+        government_id (Optional[int]): Only export this employer.
+
+    Returns:
+        AsyncIterator[bytes]: The encoded export, one chunk per batch.
+    """
+    where_clause = "WHERE government_id = %s" if government_id is not None else ""
+    params = (government_id,) if government_id is not None else ()
+    query = f"""
+        SELECT {', '.join(EMPLOYER_EXPORT_COLUMNS)}
+        FROM employers
+        {where_clause}
+        ORDER BY government_id;
+    """
+    return encode_rows(stream_rows("export_employers", query, params), EMPLOYER_EXPORT_COLUMNS, export_format)
@@ -0,0 +1,99 @@
+import csv
+import io
+import logging
+import os
+from typing import AsyncIterator, List, Sequence, Tuple
+
+import orjson
+
+from app.database.connection import get_connection, release_connection
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def stream_rows(
+    name: str,
+    query: str,
+    params: Sequence = (),
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> AsyncIterator[List[Tuple]]:
+    """
+    Run a query through a named server-side cursor and yield its rows in batches.
+
+    Only one batch is held in memory at a time. The pool connection is kept
+    for as long as the iterator is consumed and released when it is exhausted
+    or closed, e.g. when the client disconnects.
+
+    Args:
+        name (str): Name of the server-side cursor.
+        query (str): The SELECT query to run.
+        params (Sequence): The query parameters.
+        batch_size (int): Number of rows fetched per round trip.
+
+    Yields:
+        List[Tuple]: The next batch of rows.
+    """
+    connection = await get_connection(read_only=True)
+    exported = 0
+    try:
+        async with connection.cursor(name=name) as db_cursor:
+            await db_cursor.execute(query, params)
+            while True:
+                rows = await db_cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                exported += len(rows)
+                yield rows
+        logging.info(f"Export {name} finished: {exported} rows")
+    except Exception as e:
+        logging.error(f"Error exporting {name} after {exported} rows: {e}")
+        raise
+    finally:
+        await release_connection(connection)
+
+
+async def encode_rows(
+    batches: AsyncIterator[List[Tuple]],
+    columns: Sequence[str],
+    export_format: str
+) -> AsyncIterator[bytes]:
+    """
+    Serialize batches of rows as NDJSON objects or CSV lines, one chunk per batch.
+
+    Args:
+        batches (AsyncIterator[List[Tuple]]): Batches from stream_rows.
+        columns (Sequence[str]): Names of the row columns, in order.
+        export_format (str): "ndjson" or "csv".
+
+    Yields:
+        bytes: The encoded batch; for CSV the header is sent first.
+    """
+    try:
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(columns)
+            yield buffer.getvalue().encode()
+            async for rows in batches:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue().encode()
+        else:
+            async for rows in batches:
+                yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+    finally:
+        # Release the connection right away when the client goes away mid-export
+        await batches.aclose()
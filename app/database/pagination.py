@@ -0,0 +1,102 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import orjson
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+
+    Args:
+        values (Sequence[Any]): The keyset values, e.g. (first_name, personal_id).
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Tuple[Type, ...]) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor and check its shape.
+
+    Args:
+        cursor (str): The cursor received from the client.
+        types (Tuple[Type, ...]): The expected type of each keyset value.
+
+    Returns:
+        List[Any]: The keyset values.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or does not match the expected shape.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursorError("Invalid cursor")
+    for value, expected in zip(values, types):
+        # JSON has a single number type, accept ints where floats are expected
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            continue
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def encode_page(items: List[Any], next_cursor: Optional[str]) -> bytes:
+    """
+    Serialize a page for the cache as the next cursor, a newline, and the items as a JSON array.
+
+    The items are already shaped like the response model, so on a cache hit the
+    array can be sent to the client as is.
+
+    Args:
+        items (List[Any]): The rows of the page.
+        next_cursor (Optional[str]): The cursor of the next page, if any.
+
+    Returns:
+        bytes: The serialized page.
+    """
+    return (next_cursor or "").encode() + b"\n" + orjson.dumps(items)
+
+
+def decode_page(page: bytes) -> Tuple[bytes, Optional[str]]:
+    """
+    Split a page serialized by encode_page without parsing the items.
+
+    Args:
+        page (bytes): The serialized page.
+
+    Returns:
+        Tuple[bytes, Optional[str]]: The JSON array of items and the next cursor.
+    """
+    next_cursor, _, body = page.partition(b"\n")
+    return body, next_cursor.decode() or None
+
+
+def encode_keyed_pages(bodies: Dict[str, bytes]) -> bytes:
+    """
+    Join the JSON arrays of several pages into a JSON object keyed by search term,
+    without parsing them.
+
+    Args:
+        bodies (Dict[str, bytes]): The JSON array of items of each term, as returned by decode_page.
+
+    Returns:
+        bytes: The JSON object.
+    """
+    return b"{" + b",".join(orjson.dumps(term) + b":" + body for term, body in bodies.items()) + b"}"
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from typing import Dict, Optional, Sequence, Set, Union
+
+import orjson
+import psycopg
+
+from app.database.connection import get_connection, release_connection
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+query_logger = logging.getLogger("app.queries")
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+# Fraction of queries logged with their duration and row count; slow queries are always logged
+QUERY_LOG_SAMPLE_RATE = float(os.getenv("QUERY_LOG_SAMPLE_RATE", 0.01))
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 500))
+# At most one plan per query name in this many seconds, and one capture at a time
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", 300))
+# The EXPLAIN ANALYZE run is cancelled after this long
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", 10000))
+
+QueryParams = Union[Sequence, Dict[str, object]]
+
+_last_explained: Dict[str, float] = {}
+_explain_tasks: Set[asyncio.Task] = set()
+
+
+def _log_event(logger: logging.Logger, level: int, event: Dict[str, object]) -> None:
+    logger.log(level, orjson.dumps(event).decode())
+
+
+async def execute_query(
+    cursor: psycopg.AsyncCursor,
+    name: str,
+    query: str,
+    params: Optional[QueryParams] = None,
+    explain: bool = False,
+    prepare: Optional[bool] = None
+) -> None:
+    """
+    Execute a query and log its duration and row count under a stable name.
+
+    Only a sample of the queries is logged, as one JSON object per line and
+    without the SQL text or the parameters. Queries slower than
+    SLOW_QUERY_THRESHOLD_MS are always logged to the slow-query log, and when
+    `explain` is set their plan is captured in the background with
+    EXPLAIN (ANALYZE, BUFFERS), rate-limited by SLOW_QUERY_EXPLAIN_INTERVAL.
+
+    Args:
+        cursor (psycopg.AsyncCursor): The cursor to execute the query on.
+        name (str): Name of the query in the logs, e.g. "search_employees".
+        query (str): The SQL query.
+        params (Optional[QueryParams]): The query parameters.
+        explain (bool): Whether a slow run may be explained. EXPLAIN ANALYZE runs
+            the query again, so only pass it for read-only queries.
+        prepare (Optional[bool]): Passed to psycopg; True prepares the query on
+            the connection at once, None leaves it to psycopg's prepare_threshold.
+    """
+    started = time.perf_counter()
+    await cursor.execute(query, params, prepare=prepare)
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    event = {"query": name, "duration_ms": round(duration_ms, 3), "rows": cursor.rowcount}
+    if duration_ms >= SLOW_QUERY_THRESHOLD_MS:
+        _log_event(slow_query_logger, logging.WARNING, {"event": "slow_query", **event})
+        if explain:
+            schedule_explain(name, query, params)
+    elif random.random() < QUERY_LOG_SAMPLE_RATE:
+        _log_event(query_logger, logging.INFO, {"event": "query", **event})
+
+
+def schedule_explain(name: str, query: str, params: Optional[QueryParams]) -> bool:
+    """
+    Capture the plan of a slow query in the background, unless one was captured
+    for the same query name recently or another capture is still running.
+
+    Args:
+        name (str): Name of the query.
+        query (str): The SQL query.
+        params (Optional[QueryParams]): The query parameters.
+
+    Returns:
+        bool: True if a capture was started.
+    """
+    now = time.monotonic()
+    if _explain_tasks or now - _last_explained.get(name, float("-inf")) < SLOW_QUERY_EXPLAIN_INTERVAL:
+        return False
+    _last_explained[name] = now
+
+    task = asyncio.create_task(explain_query(name, query, params))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+    return True
+
+
+async def explain_query(name: str, query: str, params: Optional[QueryParams]) -> None:
+    """
+    Run EXPLAIN (ANALYZE, BUFFERS) for a query in a read-only transaction and
+    write the plan to the slow-query log.
+
+    The plan comes from a second run, so its timings and buffer hits can be
+    better than those of the slow run, whose pages are now cached.
+
+    Args:
+        name (str): Name of the query.
+        query (str): The SQL query.
+        params (Optional[QueryParams]): The query parameters.
+    """
+    connection = await get_connection(read_only=True)
+    if connection is None:
+        return
+    try:
+        cursor = connection.cursor()
+        await cursor.execute("SET TRANSACTION READ ONLY;")
+        await cursor.execute(f"SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS};")
+        await cursor.execute(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.strip().rstrip(";"),
+            params
+        )
+        (plan,) = await cursor.fetchone()
+        _log_event(slow_query_logger, logging.WARNING, {
+            "event": "slow_query_plan",
+            "query": name,
+            "sql": re.sub(r"\s+", " ", query).strip(),
+            "plan": plan,
+        })
+    except Exception as e:
+        logging.error(f"Error explaining slow query {name}: {e}")
+    finally:
+        await release_connection(connection)
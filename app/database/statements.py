@@ -0,0 +1,100 @@
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from weakref import WeakKeyDictionary
+
+import psycopg
+
+from app.database.query_log import QueryParams, execute_query
+from app.metrics.prometheus import DB_STATEMENT_BYTES_SAVED, DB_STATEMENT_DURATION
+
+# Hot statements by name, registered at import time by the modules that run them
+STATEMENTS: Dict[str, str] = {}
+
+# Names prepared on each pooled connection. A reconnect yields a new connection
+# object, which starts empty, so its statements are prepared again.
+_prepared: "WeakKeyDictionary[psycopg.AsyncConnection, Set[str]]" = WeakKeyDictionary()
+
+# Per-process counters by statement name, see get_statement_stats
+statement_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"prepared": 0, "reused": 0, "bytes_saved": 0})
+
+
+def register_statement(name: str, query: str) -> str:
+    """
+    Register a hot query under a name, to be executed with execute_statement.
+
+    Args:
+        name (str): Unique statement name, also used in the query logs.
+        query (str): The SQL query, with %s or %(name)s placeholders.
+
+    Returns:
+        str: The name, for use as a module constant.
+
+    Raises:
+        ValueError: If another query is registered under the same name.
+    """
+    if STATEMENTS.get(name, query) != query:
+        raise ValueError(f"Statement {name} is already registered with a different query")
+    STATEMENTS[name] = query
+    return name
+
+
+async def execute_statement(
+    cursor: psycopg.AsyncCursor,
+    name: str,
+    params: Optional[QueryParams] = None,
+    explain: bool = False
+) -> None:
+    """
+    Execute a registered statement, prepared on the cursor's connection.
+
+    The first call on a connection prepares the statement; later calls send
+    only its name and parameters, and reuse the parsed query and, once
+    Postgres settles on a generic plan, the plan.
+
+    Args:
+        cursor (psycopg.AsyncCursor): The cursor to execute the statement on.
+        name (str): Name of a registered statement.
+        params (Optional[QueryParams]): The query parameters.
+        explain (bool): Whether a slow run may be explained, see execute_query.
+    """
+    query = STATEMENTS[name]
+    prepared = _prepared.setdefault(cursor.connection, set())
+    reused = name in prepared
+
+    started = time.perf_counter()
+    await execute_query(cursor, name, query, params, explain=explain, prepare=True)
+    elapsed = time.perf_counter() - started
+    prepared.add(name)
+
+    stats = statement_stats[name]
+    if reused:
+        stats["reused"] += 1
+        stats["bytes_saved"] += len(query.encode())
+        DB_STATEMENT_BYTES_SAVED.labels(name).inc(len(query.encode()))
+    else:
+        stats["prepared"] += 1
+    DB_STATEMENT_DURATION.labels(name, "reuse" if reused else "prepare").observe(elapsed)
+
+
+def get_statement_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Report how often every registered statement reused its preparation in this process.
+
+    The time this saves is visible in db_statement_duration_seconds by mode,
+    and measured per call by benchmarks/prepared_statements.py.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per statement: the prepared and reused call counts,
+            the reuse ratio and the bytes of SQL not sent.
+    """
+    report = {}
+    for name, stats in statement_stats.items():
+        calls = stats["prepared"] + stats["reused"]
+        report[name] = {
+            "prepared": stats["prepared"],
+            "reused": stats["reused"],
+            "reuse_ratio": stats["reused"] / calls if calls else 0.0,
+            "bytes_saved": stats["bytes_saved"],
+        }
+    return report
@@ -0,0 +1,51 @@
+import os
+from typing import Sequence, Tuple
+
+import psycopg
+
+from app.database.query_log import execute_query
+
+# Totals up to this many rows are counted exactly; larger ones are estimated
+SEARCH_TOTAL_EXACT_LIMIT = int(os.getenv("SEARCH_TOTAL_EXACT_LIMIT", 10000))
+
+
+async def count_matches(
+    cursor: psycopg.AsyncCursor,
+    name: str,
+    from_where: str,
+    params: Sequence,
+    exact_limit: int = SEARCH_TOTAL_EXACT_LIMIT
+) -> Tuple[int, bool]:
+    """
+    Count the rows matching a search, exactly when there are few of them and
+    from the planner's estimate otherwise.
+
+    The count stops after exact_limit + 1 rows, so a broad search costs a
+    bounded scan rather than a full one. Only when the bound is reached does
+    the planner estimate the total; it is never lower than the rows counted.
+
+    Args:
+        cursor (psycopg.AsyncCursor): The cursor to run the queries on.
+        name (str): Name of the count in the query logs.
+        from_where (str): The FROM and WHERE clauses of the search, e.g.
+            "FROM employers WHERE government_id = %s".
+        params (Sequence): The parameters of from_where.
+        exact_limit (int): The largest total that is counted exactly.
+
+    Returns:
+        Tuple[int, bool]: The total and whether it is exact.
+    """
+    await execute_query(
+        cursor,
+        name,
+        f"SELECT count(*) FROM (SELECT 1 {from_where} LIMIT %s) AS matches;",
+        [*params, exact_limit + 1]
+    )
+    (counted,) = await cursor.fetchone()
+    if counted <= exact_limit:
+        return counted, True
+
+    # Never prepared, so the estimate is planned for these parameter values
+    await cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_where}", params, prepare=False)
+    (plan,) = await cursor.fetchone()
+    return max(int(plan[0]["Plan"]["Plan Rows"]), counted), False
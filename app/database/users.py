@@ -1,6 +1,8 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from app.database.connection import get_connection, release_connection
+from psycopg.rows import dict_row
+from app.database.connection import get_connection, release_connection, remember_write
+from app.database.query_log import execute_query
+from app.database.statements import execute_statement, register_statement
+from app.metrics.prometheus import observe_db
 import logging
 
 # Configure logging
@@ -9,7 +11,12 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
-def get_user(username: str):
+# Looked up on every login and sign-up
+GET_USER = register_statement("get_user", "SELECT * FROM users WHERE username = %s;")
+GET_PASSWORD_HASH = register_statement("get_password_hash", "SELECT password_hash FROM users WHERE username = %s;")
+
+@observe_db
+async def get_user(username: str):
     """
     Check if a user exists in the database by username.
 
@@ -19,11 +26,11 @@ def get_user(username: str):
     Returns:
         dict: User data if found, None otherwise.
     """
-    connection = get_connection()
+    connection = await get_connection(read_only=True, client=username)
     try:
-        cursor = connection.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM users WHERE username = %s;", (username,))
-        user = cursor.fetchone()
+        cursor = connection.cursor(row_factory=dict_row)
+        await execute_statement(cursor, GET_USER, (username,), explain=True)
+        user = await cursor.fetchone()
         if user:
             logging.info(f"User '{username}' found in the database.")
         else:
@@ -33,10 +40,34 @@ def get_user(username: str):
         logging.error(f"Error fetching user '{username}': {e}")
         raise
     finally:
-        release_connection(connection)
+        await release_connection(connection)
+
+
+@observe_db
+async def get_password_hash(username: str):
+    """
+    Fetch only the password hash of a user, for login.
 
+    Args:
+        username (str): The username to look up.
+
+    Returns:
+        str: The password hash if the user exists, None otherwise.
+    """
+    connection = await get_connection(read_only=True, client=username)
+    try:
+        cursor = connection.cursor()
+        await execute_statement(cursor, GET_PASSWORD_HASH, (username,), explain=True)
+        row = await cursor.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        logging.error(f"Error fetching user '{username}': {e}")
+        raise
+    finally:
+        await release_connection(connection)
 
-def create_user_in_db(username: str, hashed_password: str):
+@observe_db
+async def create_user_in_db(username: str, hashed_password: str):
     """
     Insert a new user into the database and return success or error messages.
 
@@ -47,21 +78,24 @@ def create_user_in_db(username: str, hashed_password: str):
     Returns:
         dict: A dictionary containing the status and message of the operation.
     """
-    connection = get_connection()
+    connection = await get_connection()
     try:
         cursor = connection.cursor()
-        cursor.execute(
+        await execute_query(
+            cursor,
+            "create_user",
             """
             INSERT INTO users (username, password_hash)
             VALUES (%s, %s);
             """,
             (username, hashed_password),
         )
-        connection.commit()
+        await connection.commit()
+        await remember_write(username)
         logging.info(f"User '{username}' created successfully.")
         return {"status": "success", "message": f"User '{username}' created successfully."}
     except Exception as e:
         logging.error(f"Error creating user '{username}': {e}")
         return {"status": "error", "message": str(e)}
     finally:
-        release_connection(connection)
+        await release_connection(connection)
@@ -0,0 +1,187 @@
+import csv
+import logging
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import orjson
+from pydantic import ValidationError
+
+from app.schemas.employees import EmployeeBulkRow
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+# Only the first errors are returned to the client; the rest are counted
+BULK_MAX_REPORTED_ERRORS = int(os.getenv("BULK_MAX_REPORTED_ERRORS", 1000))
+# A line longer than this aborts the load instead of growing the read buffer
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", 64 * 1024))
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/jsonl"}
+CSV_CONTENT_TYPES = {"text/csv"}
+
+REQUIRED_CSV_COLUMNS = {"personal_id", "first_name", "last_name", "position"}
+
+
+class BulkFormatError(ValueError):
+    """Raised when the request body cannot be read as a whole, e.g. a bad CSV header."""
+
+
+class BulkLoadReport:
+    """
+    Counts the received rows and collects per-row errors of a bulk load.
+
+    Attributes:
+        received (int): Number of non-empty data lines read from the request.
+        failed (int): Number of rows that were rejected.
+        errors (List[Dict[str, Union[int, str]]]): The first rejected rows, by line number.
+    """
+
+    def __init__(self, max_errors: int = BULK_MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.received = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Union[int, str]]] = []
+
+    def add_error(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self, inserted: int, updated: int) -> Dict[str, Union[int, List]]:
+        return {
+            "received": self.received,
+            "inserted": inserted,
+            "updated": updated,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+        }
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Split a byte stream into numbered lines without reading it all into memory.
+
+    Args:
+        stream (AsyncIterator[bytes]): The request body chunks.
+
+    Yields:
+        Tuple[int, bytes]: The 1-based line number and the line without its line ending.
+
+    Raises:
+        BulkFormatError: If a line is longer than BULK_MAX_LINE_BYTES.
+    """
+    buffer = b""
+    line_no = 0
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip(b"\r")
+        if len(buffer) > BULK_MAX_LINE_BYTES:
+            raise BulkFormatError(f"Line {line_no + 1} is longer than {BULK_MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield line_no + 1, buffer.rstrip(b"\r")
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def parse_ndjson(
+    lines: AsyncIterator[Tuple[int, bytes]],
+    report: BulkLoadReport
+) -> AsyncIterator[Tuple[int, EmployeeBulkRow]]:
+    """
+    Parse NDJSON lines into employee rows, one JSON object per line.
+
+    Args:
+        lines (AsyncIterator[Tuple[int, bytes]]): Numbered lines from iter_lines.
+        report (BulkLoadReport): Receives the row count and the rejected lines.
+
+    Yields:
+        Tuple[int, EmployeeBulkRow]: The line number and the validated row.
+    """
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        report.received += 1
+        try:
+            row = EmployeeBulkRow.model_validate(orjson.loads(line))
+        except orjson.JSONDecodeError as e:
+            report.add_error(line_no, f"Invalid JSON: {e}")
+            continue
+        except ValidationError as e:
+            report.add_error(line_no, describe_validation_error(e))
+            continue
+        yield line_no, row
+
+
+async def parse_csv(
+    lines: AsyncIterator[Tuple[int, bytes]],
+    report: BulkLoadReport,
+    delimiter: str = ","
+) -> AsyncIterator[Tuple[int, EmployeeBulkRow]]:
+    """
+    Parse CSV lines into employee rows. The first line is the header and
+    must name at least the personal_id, first_name, last_name and position
+    columns; government_id is optional. Quoted fields may not span lines.
+
+    Args:
+        lines (AsyncIterator[Tuple[int, bytes]]): Numbered lines from iter_lines.
+        report (BulkLoadReport): Receives the row count and the rejected lines.
+        delimiter (str): The field delimiter.
+
+    Yields:
+        Tuple[int, EmployeeBulkRow]: The line number and the validated row.
+
+    Raises:
+        BulkFormatError: If the header is missing or lacks a required column.
+    """
+    header: Optional[List[str]] = None
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            text = line.decode("utf-8-sig" if header is None else "utf-8")
+        except UnicodeDecodeError as e:
+            if header is None:
+                raise BulkFormatError(f"Invalid UTF-8 in the CSV header: {e}")
+            report.received += 1
+            report.add_error(line_no, f"Invalid UTF-8: {e}")
+            continue
+        try:
+            values = next(csv.reader([text], delimiter=delimiter))
+        except csv.Error as e:
+            if header is None:
+                raise BulkFormatError(f"Invalid CSV header: {e}")
+            report.received += 1
+            report.add_error(line_no, f"Invalid CSV: {e}")
+            continue
+
+        if header is None:
+            header = [column.strip() for column in values]
+            missing = REQUIRED_CSV_COLUMNS - set(header)
+            if missing:
+                raise BulkFormatError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+            continue
+
+        report.received += 1
+        if len(values) != len(header):
+            report.add_error(line_no, f"Expected {len(header)} fields, got {len(values)}")
+            continue
+        fields = dict(zip(header, values))
+        if not fields.get("government_id"):
+            fields["government_id"] = None
+        try:
+            row = EmployeeBulkRow.model_validate(fields)
+        except ValidationError as e:
+            report.add_error(line_no, describe_validation_error(e))
+            continue
+        yield line_no, row
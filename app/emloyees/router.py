@@ -1,9 +1,39 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Union
 from app.auth.jwt import requires_auth
+from app.cache.conditional import search_etag, etag_matches, cache_headers, not_modified
 from app.database.employers import get_employer_by_name
-from app.schemas.employees import EmployeeCreate, EmployeeResponse, AttachEmployeeRequest
-from app.database.employees import search_employees_in_db, create_employee_in_db, attach_employee_to_employer
+from app.database.pagination import InvalidCursorError
+from app.database.export import EXPORT_FORMATS
+from app.schemas.employees import (
+    EmployeeCreate,
+    EmployeeResponse,
+    BatchSearchRequest,
+    AttachEmployeeRequest,
+    BulkAttachRequest,
+    BulkAttachResponse,
+    BulkLoadResponse,
+)
+from app.database.employees import (
+    search_employees_json,
+    search_employees_batch_json,
+    count_employees,
+    create_employee_in_db,
+    attach_employee_to_employer,
+    attach_employees_to_employers,
+    bulk_upsert_employees,
+    export_employees,
+    suggest_employees,
+)
+from app.emloyees.bulk import (
+    BulkLoadReport,
+    CSV_CONTENT_TYPES,
+    NDJSON_CONTENT_TYPES,
+    iter_lines,
+    parse_csv,
+    parse_ndjson,
+)
 
 employees_router = APIRouter()
 
@@ -14,22 +44,100 @@ async def search_employees(
     request: Request,
     search: Optional[str] = None,
     skip: int = 0,
-    limit: int = 10
-) -> list[dict[str, int | str | None]]:
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> Response:
     """
     Search employees (requires authentication).
-    Caches results for 1 minute.
+    Caches results until the next employee write.
+
+    The cursor of the next page is returned in the X-Next-Cursor header, and
+    X-Has-More tells whether there is one. With include_total, X-Total-Count
+    carries the number of matches and X-Total-Count-Exact whether it was
+    counted or estimated.
+    Responses carry a weak ETag of the employee data version and the query;
+    a matching If-None-Match gets a 304 without querying the database.
+    The body is sent as the cached JSON bytes, without re-validating them
+    through EmployeeResponse; response_model only documents the shape.
 
     Args:
         request (Request): The HTTP request object.
         search (Optional[str]): Search query for employees.
-        skip (int): Number of records to skip for pagination.
+        skip (int): Number of records to skip for pagination (deprecated, use cursor).
         limit (int): Maximum number of records to retrieve.
+        cursor (Optional[str]): Cursor from a previous page's X-Next-Cursor header.
+        include_total (bool): Whether to return the total number of matches.
 
     Returns:
         List[EmployeeResponse]: List of employees matching the search criteria.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    params = {"search": search, "skip": skip, "limit": limit, "cursor": cursor, "include_total": include_total}
+    etag = await search_etag("employees", params)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        body, next_cursor = await search_employees_json(search=search, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Has-More": "true" if next_cursor else "false", **cache_headers(etag)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        total, exact = await count_employees(search)
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Exact"] = "true" if exact else "false"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@employees_router.post("/search/batch", response_model=Dict[str, List[EmployeeResponse]])
+@requires_auth
+async def search_employees_batch(
+    request: Request,
+    batch: BatchSearchRequest
+) -> Response:
+    """
+    Search employees for many terms in one request (requires authentication).
+
+    Each term gets the first page its own GET / search would return, from the
+    same cache entries; uncached terms are answered by a single query.
+
+    Args:
+        request (Request): The HTTP request object.
+        batch (BatchSearchRequest): The search terms and the results per term.
+
+    Returns:
+        Dict[str, List[EmployeeResponse]]: The employees matching each term, keyed by term.
     """
-    return search_employees_in_db(search=search, skip=skip, limit=limit)
+    body = await search_employees_batch_json(batch.terms, batch.limit)
+    return Response(content=body, media_type="application/json")
+
+
+@employees_router.get("/suggest", response_model=List[EmployeeResponse])
+@requires_auth
+async def get_employee_suggestions(
+    request: Request,
+    q: str = Query(..., min_length=3, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+) -> Response:
+    """
+    Suggest employees by partial or misspelled name, for typeahead (requires authentication).
+
+    Args:
+        request (Request): The HTTP request object.
+        q (str): The name typed so far, at least 3 characters.
+        limit (int): Maximum number of suggestions.
+
+    Returns:
+        List[EmployeeResponse]: The best matching employees, prefix matches first.
+    """
+    body = await suggest_employees(q, limit)
+    return Response(content=body, media_type="application/json")
 
 
 @employees_router.post("/", response_model=EmployeeResponse)
@@ -52,12 +160,60 @@ async def create_employee(
         HTTPException: If there is an error during employee creation.
     """
     try:
-        new_employee = create_employee_in_db(employee)
+        new_employee = await create_employee_in_db(employee)
         return new_employee
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@employees_router.post("/bulk", response_model=BulkLoadResponse)
+@requires_auth
+async def bulk_load_employees(request: Request, delimiter: str = ",") -> Dict[str, Union[int, List]]:
+    """
+    Create or update employees in bulk (requires authentication).
+
+    The body is NDJSON (application/x-ndjson) with one employee object per line,
+    or CSV (text/csv) with a header line. It is streamed into the database as it
+    is received. Existing employees are updated; invalid rows, duplicates and
+    rows referencing an unknown employer are reported by line number.
+
+    Args:
+        request (Request): The HTTP request object.
+        delimiter (str): The CSV field delimiter.
+
+    Returns:
+        BulkLoadResponse: The row counts and the first rejected rows.
+
+    Raises:
+        HTTPException: If the content type is unsupported or the load fails as a whole.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    report = BulkLoadReport()
+    lines = iter_lines(request.stream())
+    if content_type in NDJSON_CONTENT_TYPES:
+        rows = parse_ndjson(lines, report)
+    elif content_type in CSV_CONTENT_TYPES:
+        if len(delimiter) != 1:
+            raise HTTPException(status_code=400, detail="Delimiter must be a single character")
+        rows = parse_csv(lines, report, delimiter)
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type, expected one of: "
+                   f"{', '.join(sorted(NDJSON_CONTENT_TYPES | CSV_CONTENT_TYPES))}"
+        )
+
+    try:
+        result = await bulk_upsert_employees(rows, max_errors=report.max_errors)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for error in result["errors"]:
+        report.add_error(error["line"], error["error"])
+    report.failed += result["rejected"] - len(result["errors"])
+    return report.as_dict(result["inserted"], result["updated"])
+
+
 @employees_router.patch("/attach", response_model=Dict[str, Union[str, Dict]])
 @requires_auth
 async def attach_employee(request: Request, attach_data: AttachEmployeeRequest) -> Dict[str, Union[str, Dict]]:
@@ -83,7 +239,7 @@ async def attach_employee(request: Request, attach_data: AttachEmployeeRequest)
                 detail="Government_id must be provided"
             )
     # Attach the employee to the employer
-    updated_employee, error = attach_employee_to_employer(attach_data.personal_id, government_id)
+    updated_employee, error = await attach_employee_to_employer(attach_data.personal_id, government_id)
 
     if error:
         raise HTTPException(
@@ -92,3 +248,56 @@ async def attach_employee(request: Request, attach_data: AttachEmployeeRequest)
         )
 
     return {"message": "Employee attached successfully", "employee": updated_employee}
+
+
+@employees_router.patch("/attach/bulk", response_model=BulkAttachResponse)
+@requires_auth
+async def attach_employees(request: Request, attach_data: BulkAttachRequest) -> Dict[str, Union[int, List[int]]]:
+    """
+    Attach many employees to employers in one statement (requires authentication).
+
+    Args:
+        request (Request): The HTTP request object.
+        attach_data (BulkAttachRequest): The (personal_id, government_id) pairs to attach.
+
+    Returns:
+        BulkAttachResponse: The number of attached employees, and the personal IDs and
+            government IDs that were not found.
+
+    Raises:
+        HTTPException: If an error occurs during the update.
+    """
+    try:
+        return await attach_employees_to_employers(
+            [(item.personal_id, item.government_id) for item in attach_data.attachments]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@employees_router.get("/export")
+@requires_auth
+async def download_employees(
+    request: Request,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    government_id: Optional[int] = None
+) -> StreamingResponse:
+    """
+    Stream all employees as NDJSON or CSV (requires authentication).
+
+    Rows are read from a server-side cursor in fixed-size batches, so memory
+    use does not grow with the size of the table.
+
+    Args:
+        request (Request): The HTTP request object.
+        export_format (str): "ndjson" (default) or "csv", passed as the format query parameter.
+        government_id (Optional[int]): Only export employees of this employer.
+
+    Returns:
+        StreamingResponse: The exported employees.
+    """
+    return StreamingResponse(
+        export_employees(export_format, government_id),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename=employees.{export_format}"}
+    )
@@ -1,7 +1,21 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, Request
-from app.schemas.employers import EmployerCreate, EmployerResponse
-from app.database.employers import create_employer_in_db, search_employers
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from app.schemas.employers import EmployerCreate, EmployerResponse, EmployerHeadcountResponse, EmployerRosterResponse
+from app.schemas.employees import BatchSearchRequest
+from app.database.employers import (
+    create_employer_in_db,
+    search_employers_json,
+    search_employers_batch_json,
+    count_employers,
+    export_employers,
+    suggest_employers,
+    get_employer_roster,
+    list_employers_by_headcount,
+)
+from app.database.pagination import InvalidCursorError
+from app.database.export import EXPORT_FORMATS
 from app.auth.jwt import decode_jwt, requires_auth
+from app.cache.conditional import search_etag, etag_matches, cache_headers, not_modified
 
 employers_router = APIRouter()
 
@@ -10,7 +24,7 @@ employers_router = APIRouter()
 @requires_auth
 async def create_employer(request: Request, employer: EmployerCreate):
     try:
-        new_employer = create_employer_in_db(employer)
+        new_employer = await create_employer_in_db(employer)
         return new_employer
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -21,6 +35,99 @@ async def create_employer(request: Request, employer: EmployerCreate):
 async def get_employers(request: Request,
                         search: str = None,
                         skip: int = 0,
-                        limit: int = 10,
+                        limit: int = Query(10, ge=1, le=100),
+                        cursor: str = None,
+                        include_total: bool = False,
                         ):
-    return search_employers(search=search, skip=skip, limit=limit)
+    # The ETag follows the employer data version, so a matching poll never reaches Postgres
+    params = {"search": search, "skip": skip, "limit": limit, "cursor": cursor, "include_total": include_total}
+    etag = await search_etag("employers", params)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        body, next_cursor = await search_employers_json(search=search, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Cached JSON bytes are sent as is, response_model only documents the shape
+    headers = {"X-Has-More": "true" if next_cursor else "false", **cache_headers(etag)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        # Exact up to SEARCH_TOTAL_EXACT_LIMIT, estimated above it
+        total, exact = await count_employers(search)
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Exact"] = "true" if exact else "false"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@employers_router.post("/search/batch", response_model=dict[str, list[EmployerResponse]])
+@requires_auth
+async def search_employers_batch(request: Request, batch: BatchSearchRequest):
+    # First page of each term, from the search cache or a single query for all the misses
+    body = await search_employers_batch_json(batch.terms, batch.limit)
+    return Response(content=body, media_type="application/json")
+
+
+@employers_router.get("/suggest", response_model=list[EmployerResponse])
+@requires_auth
+async def get_employer_suggestions(request: Request,
+                                   q: str = Query(..., min_length=3, max_length=100),
+                                   limit: int = Query(10, ge=1, le=50),
+                                   ):
+    # Typeahead: prefix matches first, then the closest names by trigram similarity
+    body = await suggest_employers(q, limit)
+    return Response(content=body, media_type="application/json")
+
+
+@employers_router.get("/by_headcount", response_model=list[EmployerHeadcountResponse])
+@requires_auth
+async def get_employers_by_headcount(request: Request,
+                                     response: Response,
+                                     limit: int = Query(10, ge=1, le=100),
+                                     cursor: str = None,
+                                     ):
+    try:
+        employers, next_cursor = await list_employers_by_headcount(limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return employers
+
+
+@employers_router.get("/{government_id}/employees", response_model=EmployerRosterResponse)
+@requires_auth
+async def get_employer_employees(request: Request,
+                                 response: Response,
+                                 government_id: int,
+                                 limit: int = Query(10, ge=1, le=100),
+                                 cursor: str = None,
+                                 ):
+    try:
+        roster = await get_employer_roster(government_id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if roster is None:
+        raise HTTPException(status_code=404, detail=f"Employer with government ID {government_id} not found")
+
+    employer, next_cursor = roster
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return employer
+
+
+@employers_router.get("/export")
+@requires_auth
+async def download_employers(request: Request,
+                             export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                             government_id: int = None,
+                             ):
+    # Streamed from a server-side cursor in batches, memory use does not grow with the table
+    return StreamingResponse(
+        export_employers(export_format, government_id),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename=employers.{export_format}"}
+    )
@@ -3,16 +3,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.auth.router import router as auth_router
 import uvicorn
-from app.database.connection import connection_pool, close_all_connections
-from app.cache.redis import redis_client
+from app.database.connection import open_pool, close_all_connections
+from app.cache.redis import redis_client, close_redis
+from app.auth.hashing import start_password_pool, shutdown_password_pool
 from app.emloyees.router import employees_router
 from app.employers.router import employers_router
-
-app = FastAPI()
-
-app.include_router(auth_router, prefix="/auth", tags=["Auth"])
-app.include_router(employers_router, prefix="/employers", tags=["Employers"])
-app.include_router(employees_router, prefix="/employees", tags=["Employees"])
+from app.metrics.prometheus import MetricsMiddleware
+from app.metrics.router import metrics_router
 
 
 @asynccontextmanager
@@ -22,15 +19,18 @@ async def lifespan(app: FastAPI):
     """
     # Startup tasks
     try:
-        # Check database connection
-        connection = connection_pool.getconn()
+        # Open the database connection pool
+        await open_pool()
         print("Database connection pool initialized.")
-        connection_pool.putconn(connection)
 
         # Check Redis connection
-        redis_client.ping()
+        await redis_client.ping()
         print("Redis connection initialized.")
 
+        # Start the bcrypt process pool
+        start_password_pool()
+        print("Password hashing pool initialized.")
+
     except Exception as e:
         print(f"Error during startup: {e}")
         raise
@@ -40,12 +40,25 @@ async def lifespan(app: FastAPI):
 
     # Shutdown tasks
     try:
-        close_all_connections()
+        await close_all_connections()
         print("Database connection pool closed.")
+        await close_redis()
+        print("Redis connection closed.")
+        shutdown_password_pool()
+        print("Password hashing pool closed.")
     except Exception as e:
         print(f"Error during shutdown: {e}")
 
 
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+app.include_router(auth_router, prefix="/auth", tags=["Auth"])
+app.include_router(employers_router, prefix="/employers", tags=["Employers"])
+app.include_router(employees_router, prefix="/employees", tags=["Employees"])
+app.include_router(metrics_router)
+
+
 @app.get("/")
 def root():
     return {"message": "API is running"}
@@ -0,0 +1,81 @@
+from typing import Iterator
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector
+
+from app.cache.redis import get_cache_stats
+from app.database.connection import DB_REPLICA_HOSTS, connection_pool, replica_pools
+
+# cache_stats counter name -> result label
+CACHE_RESULTS = {"hits": "hit", "misses": "miss", "stale": "stale"}
+
+
+class PoolCollector(Collector):
+    """
+    Reports the size and saturation of the primary and replica pools, read from the pools at scrape time.
+    """
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        families = {
+            "max_size": GaugeMetricFamily("db_pool_max_size", "Maximum number of connections.", labels=["pool"]),
+            "size": GaugeMetricFamily("db_pool_size", "Open connections, in use or idle.", labels=["pool"]),
+            "in_use": GaugeMetricFamily("db_pool_in_use", "Connections checked out of the pool.", labels=["pool"]),
+            "waiting": GaugeMetricFamily(
+                "db_pool_requests_waiting", "Requests waiting for a connection.", labels=["pool"]
+            ),
+            "saturation": GaugeMetricFamily(
+                "db_pool_saturation", "Share of the maximum pool size checked out.", labels=["pool"]
+            ),
+            "errors": CounterMetricFamily(
+                "db_pool_request_errors",
+                "Connection requests that failed, e.g. timed out waiting for a connection.",
+                labels=["pool"],
+            ),
+        }
+        pools = [("primary", connection_pool), *zip(DB_REPLICA_HOSTS, replica_pools)]
+        for name, pool in pools:
+            stats = pool.get_stats()
+            size = stats.get("pool_size", 0)
+            in_use = size - stats.get("pool_available", 0)
+            families["max_size"].add_metric([name], pool.max_size)
+            families["size"].add_metric([name], size)
+            families["in_use"].add_metric([name], in_use)
+            families["waiting"].add_metric([name], stats.get("requests_waiting", 0))
+            families["saturation"].add_metric([name], in_use / max(pool.max_size, 1))
+            families["errors"].add_metric([name], stats.get("requests_errors", 0))
+        yield from families.values()
+
+
+class CacheCollector(Collector):
+    """
+    Reports the cache counters kept by app.cache.redis, per tier and key family.
+    """
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        stats = get_cache_stats()
+
+        lookups = CounterMetricFamily(
+            "cache_lookups", "Cache lookups by tier, key family and result.", labels=["tier", "family", "result"]
+        )
+        memory = stats["memory"]
+        lookups.add_metric(["memory", "", "hit"], memory["hits"])
+        lookups.add_metric(["memory", "", "miss"], memory["misses"])
+        for family, counters in stats["redis"].items():
+            for counter, result in CACHE_RESULTS.items():
+                if counter in counters:
+                    lookups.add_metric(["redis", family, result], counters[counter])
+        yield lookups
+
+        yield CounterMetricFamily(
+            "cache_memory_evictions", "Entries evicted from the in-process tier.", value=memory["evictions"]
+        )
+        yield GaugeMetricFamily("cache_memory_bytes", "Bytes held by the in-process tier.", value=memory["bytes"])
+        yield GaugeMetricFamily("cache_memory_entries", "Entries held by the in-process tier.", value=memory["entries"])
+
+
+def register_collectors() -> None:
+    """
+    Register the pool and cache collectors with the default registry.
+    """
+    REGISTRY.register(PoolCollector())
+    REGISTRY.register(CacheCollector())
@@ -0,0 +1,99 @@
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from prometheus_client import Counter, Histogram
+
+# Metrics are kept per process; every uvicorn worker exposes its own /metrics.
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route", "status"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent in a database function, including the pool checkout.",
+    ["function"],
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database function calls that raised.",
+    ["function"],
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Execution time of a registered hot statement, by whether it was prepared by this call or reused.",
+    ["statement", "mode"],
+)
+DB_STATEMENT_BYTES_SAVED = Counter(
+    "db_statement_bytes_saved",
+    "Bytes of SQL text not sent because a prepared statement was reused.",
+    ["statement"],
+)
+
+
+def observe_db(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorator recording the duration and failures of a database function, labelled by its name.
+
+    Args:
+        func (Callable[..., Awaitable[Any]]): The coroutine function to time.
+
+    Returns:
+        Callable[..., Awaitable[Any]]: The wrapped function.
+    """
+    duration = DB_QUERY_DURATION.labels(func.__name__)
+    errors = DB_QUERY_ERRORS.labels(func.__name__)
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs) -> Any:
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request.
+
+    Requests are labelled by route template, e.g. /employers/{government_id}/employees,
+    so path parameters do not create new series. Requests matching no route are
+    labelled "unmatched".
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            ).observe(time.perf_counter() - started)
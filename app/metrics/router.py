@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.metrics.collectors import register_collectors
+
+metrics_router = APIRouter()
+
+register_collectors()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Expose the metrics of this process in the Prometheus text format.
+
+    Returns:
+        Response: The current value of every metric.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,6 +1,10 @@
-from typing import Optional
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Range of a Postgres BIGINT
+BIGINT_MIN = -(2 ** 63)
+BIGINT_MAX = 2 ** 63 - 1
 
 
 class EmployeeCreate(BaseModel):
@@ -23,3 +27,41 @@ class EmployeeResponse(BaseModel):
 class AttachEmployeeRequest(BaseModel):
     personal_id: int
     government_id: int
+
+
+class BulkAttachRequest(BaseModel):
+    attachments: List[AttachEmployeeRequest] = Field(max_length=10000)
+
+
+class BatchSearchRequest(BaseModel):
+    """Search terms answered in one request, with the number of results per term."""
+    terms: List[Annotated[str, Field(min_length=1, max_length=200)]] = Field(min_length=1, max_length=1000)
+    limit: int = Field(default=10, ge=1, le=100)
+
+
+class BulkAttachResponse(BaseModel):
+    attached: int
+    missing_personal_ids: List[int]
+    unknown_government_ids: List[int]
+
+
+class EmployeeBulkRow(BaseModel):
+    """A single row of a bulk load, bounded by the employees column types."""
+    personal_id: int = Field(ge=BIGINT_MIN, le=BIGINT_MAX)
+    first_name: str = Field(max_length=50)
+    last_name: str = Field(max_length=50)
+    position: str = Field(max_length=100)
+    government_id: Optional[int] = Field(default=None, ge=BIGINT_MIN, le=BIGINT_MAX)
+
+
+class BulkRowError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkLoadResponse(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[BulkRowError]
@@ -1,5 +1,9 @@
+from typing import List
+
 from pydantic import BaseModel
 
+from app.schemas.employees import EmployeeResponse
+
 
 class EmployerCreate(BaseModel):
     employer_name: str
@@ -12,3 +16,13 @@ class EmployerResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class EmployerHeadcountResponse(BaseModel):
+    employer_name: str
+    government_id: int
+    headcount: int
+
+
+class EmployerRosterResponse(EmployerHeadcountResponse):
+    employees: List[EmployeeResponse]
@@ -0,0 +1,135 @@
+"""
+Compare the blocking psycopg2 pool against the async psycopg pool under concurrency.
+
+The sync variant calls psycopg2 directly from coroutines, the way the route handlers
+used to, so every query blocks the event loop. The async variant awaits the same
+query through app.database.connection.
+
+Usage:
+    python -m benchmarks.db_pool --clients 50 200 1000 --requests 20 --sleep-ms 5
+
+--sleep-ms adds a server-side pg_sleep to every call to model slower queries.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from psycopg2 import pool
+
+from app.database.connection import DB_CONFIG, connection_pool, get_connection, release_connection
+
+QUERY = """
+    SELECT personal_id, first_name, last_name, position, government_id
+    FROM employees
+    WHERE personal_id >= %s
+    ORDER BY personal_id
+    LIMIT 10;
+"""
+SLEEP_QUERY = "SELECT pg_sleep(%s);"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the given percentile (0-100) of a list of samples.
+    """
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_clients(clients: int, requests: int, call: Callable[[int], Awaitable[None]]) -> Dict[str, float]:
+    """
+    Run `clients` concurrent tasks, each issuing `requests` sequential calls.
+
+    Returns:
+        Dict[str, float]: Throughput and latency percentiles in milliseconds.
+    """
+    latencies: List[float] = []
+
+    async def client(client_id: int) -> None:
+        for i in range(requests):
+            started = time.perf_counter()
+            # Yield once, as an incoming request would, so time spent queued
+            # behind a blocked event loop counts towards latency.
+            await asyncio.sleep(0)
+            await call(client_id * requests + i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+async def bench_sync(clients: int, requests: int, sleep_ms: float, max_size: int) -> Dict[str, float]:
+    """
+    Benchmark blocking psycopg2 calls made from inside coroutines.
+    """
+    sync_pool = pool.SimpleConnectionPool(1, max_size, **DB_CONFIG)
+
+    async def call(seed: int) -> None:
+        connection = sync_pool.getconn()
+        try:
+            cursor = connection.cursor()
+            if sleep_ms:
+                cursor.execute(SLEEP_QUERY, (sleep_ms / 1000,))
+            cursor.execute(QUERY, (seed,))
+            cursor.fetchall()
+        finally:
+            sync_pool.putconn(connection)
+
+    try:
+        return await run_clients(clients, requests, call)
+    finally:
+        sync_pool.closeall()
+
+
+async def bench_async(clients: int, requests: int, sleep_ms: float) -> Dict[str, float]:
+    """
+    Benchmark the same query awaited through the async connection pool.
+    """
+    async def call(seed: int) -> None:
+        connection = await get_connection()
+        try:
+            cursor = connection.cursor()
+            if sleep_ms:
+                await cursor.execute(SLEEP_QUERY, (sleep_ms / 1000,))
+            await cursor.execute(QUERY, (seed,))
+            await cursor.fetchall()
+        finally:
+            await release_connection(connection)
+
+    return await run_clients(clients, requests, call)
+
+
+async def main(clients_levels: List[int], requests: int, sleep_ms: float) -> None:
+    await connection_pool.open(wait=True)
+    try:
+        for clients in clients_levels:
+            for name, bench in (
+                ("sync", bench_sync(clients, requests, sleep_ms, connection_pool.max_size)),
+                ("async", bench_async(clients, requests, sleep_ms)),
+            ):
+                result = await bench
+                print(
+                    f"{name:>5} clients={clients:<5} rps={result['rps']:.0f} "
+                    f"p50={result['p50']:.1f}ms p95={result['p95']:.1f}ms p99={result['p99']:.1f}ms"
+                )
+    finally:
+        await connection_pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--requests", type=int, default=20, help="Sequential requests per client.")
+    parser.add_argument("--sleep-ms", type=float, default=0, help="Server-side delay added to every call.")
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.requests, args.sleep_ms))
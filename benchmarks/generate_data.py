@@ -0,0 +1,162 @@
+"""
+Generate synthetic employers.csv and employees.csv files in the format of scripts/load_data.py.
+
+The files are written row by row, so any size fits in constant memory, and
+the same --size and --seed always produce the same files. Employees are
+spread over employers with a long tail: a few employers are very large and
+most are small, and about 5% of the employees have no employer.
+
+Personal and government IDs are derived from the row number (see
+personal_id and government_id), so the benchmark suite can pick existing
+IDs without reading the files back.
+
+Usage:
+    python -m benchmarks.generate_data --size 1m --out data/
+    python scripts/load_data.py --employers data/employers.csv --employees data/employees.csv
+"""
+import argparse
+import csv
+import os
+import random
+import time
+from typing import Dict, Tuple
+
+# Employees and employers per --size
+SIZES: Dict[str, Tuple[int, int]] = {
+    "100k": (100_000, 5_000),
+    "1m": (1_000_000, 50_000),
+    "10m": (10_000_000, 500_000),
+}
+# Share of the employees without an employer
+UNATTACHED_RATIO = 0.05
+# Higher values concentrate more employees in the first employers
+EMPLOYER_SKEW = 3
+
+FIRST_NAMES = (
+    "Noa", "Yael", "Tamar", "Maya", "Shira", "Michal", "Adi", "Roni", "Lior", "Dana",
+    "Avigail", "Hila", "Inbar", "Keren", "Neta", "Orly", "Rivka", "Sarah", "Talia", "Yarden",
+    "David", "Yosef", "Moshe", "Daniel", "Ariel", "Itai", "Omer", "Eitan", "Amit", "Noam",
+    "Yonatan", "Avraham", "Binyamin", "Gal", "Guy", "Idan", "Nadav", "Ofir", "Ron", "Uri",
+    "Mohammed", "Ahmad", "Yousef", "Omar", "Fatima", "Maryam", "Layla", "Rania", "Samir", "Nour",
+    "John", "Michael", "James", "Emma", "Olivia", "Anna", "Maria", "Elena", "Ivan", "Olga",
+)
+LAST_NAMES = (
+    "Cohen", "Levi", "Mizrahi", "Peretz", "Biton", "Dahan", "Avraham", "Friedman", "Azoulay", "Malka",
+    "Katz", "Amar", "Ohana", "Yosef", "Hadad", "Gabay", "Ben David", "Shapira", "Vaknin", "Segal",
+    "Goldberg", "Rosenberg", "Klein", "Weiss", "Stern", "Kaplan", "Levin", "Ashkenazi", "Elbaz", "Sasson",
+    "Haddad", "Khoury", "Nasser", "Mansour", "Saleh", "Abu Hussein", "Jabarin", "Masarwa", "Zoabi", "Kassem",
+    "Smith", "Johnson", "Brown", "Miller", "Davis", "Ivanov", "Petrov", "Smirnov", "Novak", "Horowitz",
+)
+POSITIONS = (
+    "Software Engineer", "Senior Software Engineer", "QA Engineer", "DevOps Engineer", "Data Analyst",
+    "Product Manager", "Project Manager", "Accountant", "Bookkeeper", "Financial Controller",
+    "Sales Representative", "Account Manager", "Customer Support", "Office Manager", "Receptionist",
+    "HR Manager", "Recruiter", "Marketing Manager", "Graphic Designer", "Content Writer",
+    "Warehouse Worker", "Forklift Operator", "Driver", "Electrician", "Technician",
+    "Nurse", "Teacher", "Cook", "Security Guard", "Cleaner",
+)
+COMPANY_WORDS = (
+    "Galil", "Negev", "Carmel", "Yarden", "Arava", "Sharon", "Golan", "Kinneret", "Tavor", "Hermon",
+    "Orion", "Delta", "Atlas", "Nova", "Zenith", "Apex", "Vertex", "Summit", "Horizon", "Pioneer",
+    "Blue", "Green", "Golden", "Silver", "Cedar", "Olive", "Palm", "Desert", "Harbor", "Valley",
+)
+COMPANY_TRADES = (
+    "Technologies", "Systems", "Logistics", "Foods", "Construction", "Engineering", "Medical",
+    "Energy", "Textiles", "Software", "Motors", "Plastics", "Electronics", "Pharma", "Retail",
+)
+COMPANY_SUFFIXES = ("Ltd", "Ltd", "Ltd", "Inc", "Group", "Holdings", "& Sons")
+
+# IDs are a bijection of the row number onto a fixed range, so they are unique and look random.
+# The multipliers are primes that do not divide the range sizes.
+PERSONAL_ID_BASE = 100_000_000
+PERSONAL_ID_RANGE = 800_000_000
+GOVERNMENT_ID_BASE = 500_000_000
+GOVERNMENT_ID_RANGE = 100_000_000
+
+
+def personal_id(row: int) -> int:
+    """
+    Return the personal ID of the employee on a 0-based row.
+    IDs from 900000000 up are never generated and free for new employees.
+    """
+    return PERSONAL_ID_BASE + (row * 7919 + 104729) % PERSONAL_ID_RANGE
+
+
+def government_id(row: int) -> int:
+    """
+    Return the government ID of the employer on a 0-based row.
+    """
+    return GOVERNMENT_ID_BASE + (row * 7877 + 15485863) % GOVERNMENT_ID_RANGE
+
+
+def employer_row(rng: random.Random, employers: int) -> int:
+    """
+    Pick an employer row with a long-tailed distribution, favouring the first rows.
+    """
+    return int(employers * rng.random() ** EMPLOYER_SKEW)
+
+
+def write_employers(path: str, employers: int, seed: int) -> None:
+    rng = random.Random(f"{seed}:employers")
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as csv_file:
+        writer = csv.writer(csv_file, delimiter=";", lineterminator="\n")
+        writer.writerow(("government_id", "employer_name"))
+        for row in range(employers):
+            name = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_TRADES)} {rng.choice(COMPANY_SUFFIXES)}"
+            # Names repeat across employers, as they do in real registries
+            writer.writerow((government_id(row), name))
+
+
+def write_employees(path: str, employees: int, employers: int, seed: int) -> None:
+    rng = random.Random(f"{seed}:employees")
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as csv_file:
+        writer = csv.writer(csv_file, delimiter=";", lineterminator="\n")
+        writer.writerow(("personal_id", "first_name", "last_name", "position", "government_id"))
+        for row in range(employees):
+            employer = "" if rng.random() < UNATTACHED_RATIO else government_id(employer_row(rng, employers))
+            writer.writerow((
+                personal_id(row),
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+                rng.choice(POSITIONS),
+                employer,
+            ))
+
+
+def generate(out_dir: str, employees: int, employers: int, seed: int) -> Tuple[str, str]:
+    """
+    Write employers.csv and employees.csv into a directory.
+
+    Args:
+        out_dir (str): The output directory, created if missing.
+        employees (int): Number of employee rows.
+        employers (int): Number of employer rows.
+        seed (int): Seed of the random choices.
+
+    Returns:
+        Tuple[str, str]: The paths of the employers and employees files.
+    """
+    if employees > PERSONAL_ID_RANGE or employers > GOVERNMENT_ID_RANGE:
+        raise ValueError("Too many rows for the generated ID ranges")
+    os.makedirs(out_dir, exist_ok=True)
+    employers_path = os.path.join(out_dir, "employers.csv")
+    employees_path = os.path.join(out_dir, "employees.csv")
+
+    started = time.perf_counter()
+    write_employers(employers_path, employers, seed)
+    write_employees(employees_path, employees, employers, seed)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {employers} employers and {employees} employees to {out_dir} in {elapsed:.1f}s")
+    return employers_path, employees_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=SIZES, default="100k")
+    parser.add_argument("--employees", type=int, help="Override the number of employees of --size.")
+    parser.add_argument("--employers", type=int, help="Override the number of employers of --size.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data", help="Output directory.")
+    args = parser.parse_args()
+    default_employees, default_employers = SIZES[args.size]
+    generate(args.out, args.employees or default_employees, args.employers or default_employers, args.seed)
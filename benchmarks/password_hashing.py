@@ -0,0 +1,79 @@
+"""
+Benchmark of password verification during a login burst.
+
+Runs --logins concurrent bcrypt verifications, the way /auth/token does,
+and reports the login throughput per core. Meanwhile a probe measures the
+latency of a trivial run_in_threadpool call, which stands in for every
+other endpoint sharing the default threadpool.
+
+    threadpool: verify_password on the default threadpool (before).
+    process pool: verify_password_async on the password hashing pool.
+
+Usage:
+    python -m benchmarks.password_hashing --logins 64 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from starlette.concurrency import run_in_threadpool
+
+import app.auth.hashing as hashing
+from app.auth.hashing import hash_password, verify_password
+
+
+async def probe(stop: asyncio.Event, latencies: List[float]) -> None:
+    """
+    Measure the latency of trivial threadpool calls until stopped.
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await run_in_threadpool(lambda: None)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def burst(verify: Callable[[str, str], Awaitable[bool]], hashed: str, logins: int) -> None:
+    stop = asyncio.Event()
+    latencies: List[float] = []
+    probe_task = asyncio.create_task(probe(stop, latencies))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify("password", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    assert all(results)
+
+    cores = min(hashing.PASSWORD_HASH_WORKERS, os.cpu_count() or 1)
+    print(
+        f"  {logins / elapsed:7.1f} logins/s, {logins / elapsed / cores:6.1f} per core, "
+        f"threadpool probe p50 {statistics.median(latencies):7.2f} ms, max {max(latencies):7.2f} ms"
+    )
+
+
+async def main(logins: int) -> None:
+    hashed = hash_password("password")
+
+    print("threadpool:")
+    await burst(lambda plain, hashed_password: run_in_threadpool(verify_password, plain, hashed_password), hashed, logins)
+
+    print(f"process pool ({hashing.PASSWORD_HASH_WORKERS} workers, {hashing.PASSWORD_HASH_MAX_PENDING} pending):")
+    hashing.PASSWORD_HASH_MAX_PENDING = max(hashing.PASSWORD_HASH_MAX_PENDING, logins)
+    hashing.start_password_pool()
+    # Spawn the workers before timing
+    await asyncio.gather(*(hashing.verify_password_async("password", hashed) for _ in range(hashing.PASSWORD_HASH_WORKERS)))
+    await burst(hashing.verify_password_async, hashed, logins)
+    hashing.shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=hashing.PASSWORD_HASH_WORKERS)
+    args = parser.parse_args()
+    hashing.PASSWORD_HASH_WORKERS = args.workers
+    asyncio.run(main(args.logins))
@@ -0,0 +1,142 @@
+"""
+Benchmark of hot queries sent as SQL text versus as prepared statements.
+
+    text: the query text is sent, parsed and planned on every call (prepare=False).
+    prepared: execute_statement, which prepares the query once per pooled
+        connection and then sends only its name and parameters.
+
+First, for the ranked employee search, the employer search and the user
+lookup, both variants run back to back on one connection: without
+concurrency, the difference per call is the parse and plan time saved. The
+generic and custom plans Postgres used for the prepared calls are read from
+pg_prepared_statements.
+
+Then the ranked search runs from --clients concurrent clients against the
+pool, to show the latency at high QPS, followed by the statement counters of
+that run.
+
+Pooled connections use DB_PLAN_CACHE_MODE, "auto" by default; run with
+DB_PLAN_CACHE_MODE=force_generic_plan to compare with generic plans only.
+
+Usage:
+    python -m benchmarks.prepared_statements --clients 50 --requests 200
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.database.connection import close_all_connections, get_connection, open_pool, release_connection
+from app.database.employees import SEARCH_EMPLOYEES_STATEMENTS
+from app.database.employers import SEARCH_EMPLOYERS_STATEMENTS
+from app.database.query_log import execute_query
+from app.database.statements import STATEMENTS, execute_statement, get_statement_stats
+from app.database.users import GET_USER
+from benchmarks.db_pool import run_clients
+from benchmarks.generate_data import COMPANY_WORDS, FIRST_NAMES, LAST_NAMES
+
+SEARCH_STATEMENT = SEARCH_EMPLOYEES_STATEMENTS[(False, False)]
+TERMS = [f"{first} {last}" for first, last in itertools.product(FIRST_NAMES, LAST_NAMES)]
+
+# Statement name -> parameters of the n-th call
+STATEMENT_PARAMS: Dict[str, Callable[[int], List]] = {
+    SEARCH_STATEMENT: lambda seed: [TERMS[seed % len(TERMS)], 10, 0],
+    SEARCH_EMPLOYERS_STATEMENTS[("text", False)]: lambda seed: [COMPANY_WORDS[seed % len(COMPANY_WORDS)], 10, 0],
+    GET_USER: lambda seed: [f"user{seed % 100}"],
+}
+PLAN_COUNTS = "SELECT sum(generic_plans), sum(custom_plans) FROM pg_prepared_statements WHERE NOT from_sql;"
+
+
+async def execute_text(cursor, name: str, params: List) -> None:
+    await execute_query(cursor, name, STATEMENTS[name], params, prepare=False)
+
+
+async def execute_prepared(cursor, name: str, params: List) -> None:
+    await execute_statement(cursor, name, params)
+
+
+async def plan_counts(cursor) -> Tuple[int, int]:
+    await cursor.execute(PLAN_COUNTS)
+    generic_plans, custom_plans = await cursor.fetchone()
+    return int(generic_plans or 0), int(custom_plans or 0)
+
+
+async def time_sequential(name: str, calls: int) -> Dict[str, float]:
+    """
+    Run a statement as text, then prepared, on one connection.
+
+    Returns:
+        Dict[str, float]: The mean microseconds per call of each variant, and the
+            generic and custom plans used by the prepared calls.
+    """
+    connection = await get_connection(read_only=True)
+    try:
+        cursor = connection.cursor()
+        result = {}
+        for variant, execute in (("text", execute_text), ("prepared", execute_prepared)):
+            # Warm up the caches and, for the prepared variant, prepare the statement
+            for seed in range(5):
+                await execute(cursor, name, STATEMENT_PARAMS[name](seed))
+                await cursor.fetchall()
+            generic_before, custom_before = await plan_counts(cursor)
+            started = time.perf_counter()
+            for seed in range(calls):
+                await execute(cursor, name, STATEMENT_PARAMS[name](seed))
+                await cursor.fetchall()
+            result[variant] = (time.perf_counter() - started) / calls * 1e6
+
+        generic_after, custom_after = await plan_counts(cursor)
+        result["generic_plans"] = generic_after - generic_before
+        result["custom_plans"] = custom_after - custom_before
+        return result
+    finally:
+        await release_connection(connection)
+
+
+async def main(clients: int, requests: int, calls: int) -> None:
+    await open_pool()
+    try:
+        for name in STATEMENT_PARAMS:
+            result = await time_sequential(name, calls)
+            print(
+                f"{name:<16} text={result['text']:.0f}us prepared={result['prepared']:.0f}us "
+                f"saved={result['text'] - result['prepared']:.0f}us/call, "
+                f"{len(STATEMENTS[name].encode())}B of SQL/call, "
+                f"{result['generic_plans']} generic / {result['custom_plans']} custom plans"
+            )
+
+        for variant, execute in (("text", execute_text), ("prepared", execute_prepared)):
+            async def call(seed: int, execute=execute) -> None:
+                connection = await get_connection(read_only=True)
+                try:
+                    cursor = connection.cursor()
+                    await execute(cursor, SEARCH_STATEMENT, STATEMENT_PARAMS[SEARCH_STATEMENT](seed))
+                    await cursor.fetchall()
+                finally:
+                    await release_connection(connection)
+
+            # Warm up the pool connections and, for the prepared run, prepare the statement on each
+            await run_clients(clients, 2, call)
+            result = await run_clients(clients, requests, call)
+            print(
+                f"{variant:>8} clients={clients:<5} rps={result['rps']:.0f} "
+                f"p50={result['p50']:.2f}ms p95={result['p95']:.2f}ms p99={result['p99']:.2f}ms"
+            )
+
+        stats = get_statement_stats()[SEARCH_STATEMENT]
+        print(
+            f"{SEARCH_STATEMENT}: prepared {stats['prepared']}x, reused {stats['reused']}x "
+            f"({stats['reuse_ratio']:.1%}), {stats['bytes_saved'] / 1024:.0f} KiB of SQL not sent"
+        )
+    finally:
+        await close_all_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="Sequential searches per client.")
+    parser.add_argument("--calls", type=int, default=1000, help="Calls per variant on one connection.")
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.requests, args.calls))
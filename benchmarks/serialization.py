@@ -0,0 +1,79 @@
+"""
+Microbenchmark of the search response path on 10/100/1000-row pages.
+
+Compares, per page:
+    hit, decode+validate+encode: json.loads, EmployeeResponse validation and
+        FastAPI's jsonable_encoder + json.dumps, as cache hits used to be served.
+    hit, raw bytes: splitting the cached page and sending the JSON array as is.
+    miss, json.dumps / orjson.dumps: encoding a freshly queried page.
+
+Usage:
+    python -m benchmarks.serialization --rows 10 100 1000
+"""
+import argparse
+import json
+import timeit
+from typing import Callable, Dict, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.database.pagination import encode_page, decode_page
+from app.schemas.employees import EmployeeResponse
+
+employees_adapter = TypeAdapter(List[EmployeeResponse])
+
+
+def make_page(rows: int) -> List[Dict[str, object]]:
+    """
+    Build a page of employee rows shaped like EmployeeResponse.
+    """
+    return [
+        {
+            "personal_id": 100000000 + i,
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "position": "Software Engineer",
+        }
+        for i in range(rows)
+    ]
+
+
+def time_call(call: Callable[[], object], number: int) -> float:
+    """
+    Return the mean time of a call in microseconds, best of 5 runs.
+    """
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1e6
+
+
+def main(rows_levels: List[int]) -> None:
+    for rows in rows_levels:
+        items = make_page(rows)
+        legacy_cached = json.dumps({"items": items, "next_cursor": None})
+        cached_page = encode_page(items, None)
+        number = max(10, 20000 // rows)
+
+        def legacy_hit() -> bytes:
+            page = json.loads(legacy_cached)
+            validated = employees_adapter.validate_python(page["items"])
+            return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+        def raw_hit() -> bytes:
+            return decode_page(cached_page)[0]
+
+        results = {
+            "hit, decode+validate+encode": time_call(legacy_hit, number),
+            "hit, raw bytes": time_call(raw_hit, number),
+            "miss, json.dumps": time_call(lambda: json.dumps(items).encode(), number),
+            "miss, orjson.dumps": time_call(lambda: orjson.dumps(items), number),
+        }
+        for name, micros in results.items():
+            print(f"rows={rows:<5} {name:<30} {micros:10.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,306 @@
+"""
+End-to-end benchmark of the API on synthetic data, with a saved baseline to catch regressions.
+
+Runs scripted scenarios through the FastAPI app and reports, per scenario,
+the throughput and the p50/p95/p99 latency:
+    login: POST /auth/token with a valid password.
+    search_hit: employee searches repeating a few terms, served from the cache.
+    search_miss: employee searches on distinct full names, each one a cache miss.
+    deep_pagination: walks of --pages pages through search results with X-Next-Cursor.
+    create: POST /employees/ with new personal IDs.
+    attach: PATCH /employees/attach of random employees to random employers.
+The write scenarios run last, since every write invalidates the search caches.
+
+Without --base-url the app runs in this process, so it works with a local
+Redis as well as with REDIS_FAKE=1. With --base-url the requests go to a
+running server instead.
+
+--load generates the data set of --size with benchmarks.generate_data (unless
+the files already exist in --data-dir) and loads it with scripts/load_data.py
+first; the load time is reported with the scenarios.
+
+Usage:
+    REDIS_FAKE=1 python -m benchmarks.suite --size 100k --load --save benchmarks/baseline.json
+    REDIS_FAKE=1 python -m benchmarks.suite --size 100k --compare benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import orjson
+
+from benchmarks.db_pool import percentile
+from benchmarks.generate_data import FIRST_NAMES, LAST_NAMES, SIZES, generate, government_id, personal_id
+
+BENCH_USERNAME = "benchmark"
+BENCH_PASSWORD = "benchmark-password"
+# Personal IDs from here up are never generated, see benchmarks.generate_data.personal_id
+NEW_PERSONAL_ID_BASE = 900_000_000
+
+# A scenario issues one request per call and returns its status code
+Scenario = Callable[[httpx.AsyncClient, int], Awaitable[int]]
+
+
+class Context:
+    """
+    What the scenarios need to know about the data set and the session.
+    """
+
+    def __init__(self, employees: int, employers: int, headers: Dict[str, str], pages: int):
+        self.employees = employees
+        self.employers = employers
+        self.headers = headers
+        self.pages = pages
+        self.rng = random.Random(7)
+        # Distinct "first last" searches, in a fixed random order
+        self.full_names = [f"{first} {last}" for first, last in itertools.product(FIRST_NAMES, LAST_NAMES)]
+        self.rng.shuffle(self.full_names)
+        # Start past the IDs left by earlier runs
+        self.new_ids = itertools.count(NEW_PERSONAL_ID_BASE + int(time.time()) % 10_000_000 * 10)
+
+
+@asynccontextmanager
+async def open_client(base_url: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Open an HTTP client to a running server, or to the app in this process with its lifespan.
+    """
+    if base_url:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            yield client
+        return
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            yield client
+
+
+async def authenticate(client: httpx.AsyncClient) -> Dict[str, str]:
+    """
+    Create the benchmark user if needed and return its authorization headers.
+    """
+    credentials = {"username": BENCH_USERNAME, "password": BENCH_PASSWORD}
+    response = await client.post("/auth/token", json=credentials)
+    if response.status_code != 200:
+        response = await client.post("/auth/create-user", json=credentials)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def make_scenarios(context: Context) -> Dict[str, Scenario]:
+    headers = context.headers
+    hit_terms = FIRST_NAMES[:5]
+    miss_terms = itertools.cycle(context.full_names)
+    walk_terms = itertools.cycle(FIRST_NAMES)
+
+    async def login(client: httpx.AsyncClient, i: int) -> int:
+        response = await client.post("/auth/token", json={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+        return response.status_code
+
+    async def search_hit(client: httpx.AsyncClient, i: int) -> int:
+        response = await client.get("/employees/", params={"search": hit_terms[i % len(hit_terms)]}, headers=headers)
+        return response.status_code
+
+    async def search_miss(client: httpx.AsyncClient, i: int) -> int:
+        response = await client.get("/employees/", params={"search": next(miss_terms)}, headers=headers)
+        return response.status_code
+
+    async def deep_pagination(client: httpx.AsyncClient, i: int) -> int:
+        # Each walk uses its own page size, so walks over the same term do not share cached pages
+        params = {"search": next(walk_terms), "limit": 10 + i % 40}
+        response = await client.get("/employees/", params=params, headers=headers)
+        for _ in range(context.pages - 1):
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if response.status_code != 200 or not next_cursor:
+                break
+            response = await client.get("/employees/", params={**params, "cursor": next_cursor}, headers=headers)
+        return response.status_code
+
+    async def create(client: httpx.AsyncClient, i: int) -> int:
+        employee = {
+            "personal_id": next(context.new_ids),
+            "first_name": context.rng.choice(FIRST_NAMES),
+            "last_name": context.rng.choice(LAST_NAMES),
+            "position": "Benchmark",
+        }
+        response = await client.post("/employees/", json=employee, headers=headers)
+        return response.status_code
+
+    async def attach(client: httpx.AsyncClient, i: int) -> int:
+        attachment = {
+            "personal_id": personal_id(context.rng.randrange(context.employees)),
+            "government_id": government_id(context.rng.randrange(context.employers)),
+        }
+        response = await client.patch("/employees/attach", json=attachment, headers=headers)
+        return response.status_code
+
+    return {
+        "login": login,
+        "search_hit": search_hit,
+        "search_miss": search_miss,
+        "deep_pagination": deep_pagination,
+        "create": create,
+        "attach": attach,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int
+) -> Dict[str, float]:
+    """
+    Run `requests` calls of a scenario from `concurrency` concurrent clients.
+
+    Returns:
+        Dict[str, float]: The request and error counts, the throughput in calls per
+            second and the latency percentiles in milliseconds.
+    """
+    latencies: List[float] = []
+    errors = 0
+    calls = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in calls:
+            started = time.perf_counter()
+            try:
+                status = await scenario(client, i)
+            except httpx.HTTPError:
+                status = 0
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status >= 400 or status == 0:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+        "p99": round(percentile(latencies, 99), 2),
+    }
+
+
+def load_data(data_dir: str, employees: int, employers: int) -> Dict[str, float]:
+    """
+    Generate the data set if needed and load it with scripts/load_data.py.
+
+    Returns:
+        Dict[str, float]: The load time in seconds and the loaded rows per second.
+    """
+    employers_path = os.path.join(data_dir, "employers.csv")
+    employees_path = os.path.join(data_dir, "employees.csv")
+    if not (os.path.exists(employers_path) and os.path.exists(employees_path)):
+        generate(data_dir, employees, employers, seed=42)
+
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "load_data.py")
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, script, "--employers", employers_path, "--employees", employees_path, "--restart"],
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+    return {"seconds": round(elapsed, 1), "rows_per_second": round((employees + employers) / elapsed)}
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    List the scenarios that got slower or lost throughput beyond the tolerance.
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base:
+            continue
+        if result["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95']}ms -> {result['p95']}ms")
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {base['rps']} -> {result['rps']} requests/s")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    employees, employers = SIZES[args.size]
+    results = {
+        "meta": {
+            "size": args.size,
+            "employees": employees,
+            "employers": employers,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "pages": args.pages,
+            "target": args.base_url or "in-process",
+            "redis": "fake" if os.getenv("REDIS_FAKE") else "redis",
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "scenarios": {},
+    }
+    if args.load:
+        results["load"] = load_data(args.data_dir, employees, employers)
+        print(f"load: {results['load']['seconds']}s, {results['load']['rows_per_second']} rows/s")
+
+    async with open_client(args.base_url) as client:
+        context = Context(employees, employers, await authenticate(client), args.pages)
+        scenarios = make_scenarios(context)
+        for name in args.scenarios or scenarios:
+            scenario = scenarios[name]
+            if name == "search_hit":
+                # Warm the cache, so only hits are measured
+                for i in range(5):
+                    await scenario(client, i)
+            # Login is bounded by the bcrypt pool, not by the number of clients
+            requests = max(1, args.requests // 10) if name in ("login", "deep_pagination") else args.requests
+            result = await run_scenario(client, scenario, requests, args.concurrency)
+            results["scenarios"][name] = result
+            print(
+                f"{name:<16} requests={result['requests']:<6} errors={result['errors']:<4} "
+                f"rps={result['rps']:<8} p50={result['p50']}ms p95={result['p95']}ms p99={result['p99']}ms"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=SIZES, default="100k", help="Data set size, see benchmarks.generate_data.")
+    parser.add_argument("--load", action="store_true", help="Generate and load the data set first.")
+    parser.add_argument("--data-dir", default="data", help="Where the generated CSV files are kept.")
+    parser.add_argument("--base-url", help="URL of a running server; by default the app runs in-process.")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario (a tenth for login and walks).")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=20, help="Pages per deep pagination walk.")
+    parser.add_argument("--scenarios", nargs="+", choices=[
+        "login", "search_hit", "search_miss", "deep_pagination", "create", "attach",
+    ])
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare the results with.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before failing.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.save:
+        with open(args.save, "wb") as baseline_file:
+            baseline_file.write(orjson.dumps(results, option=orjson.OPT_INDENT_2) + b"\n")
+    if args.compare:
+        with open(args.compare, "rb") as baseline_file:
+            regressions = compare(results, orjson.loads(baseline_file.read()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
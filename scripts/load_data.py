@@ -1,8 +1,20 @@
 import psycopg2
+import psycopg2.errors
+import argparse
+import asyncio
+import io
 import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 import logging
 
+# The API's cache helpers, from the repository root (or /app in the image)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.cache.redis import bump_generation, close_redis
+
 load_dotenv()
 
 # Configure logging
@@ -21,111 +33,642 @@ DB_PORT = os.getenv("DB_PORT")
 EMPLOYERS_CSV_FILE_PATH = "/docker-entrypoint-initdb.d/employers.csv"
 EMPLOYEES_CSV_FILE_PATH = "/docker-entrypoint-initdb.d/employees.csv"
 
+# Number of connections running COPY at once, and the number of CSV rows per chunk.
+# Every chunk is loaded and checkpointed in its own transaction.
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", "4"))
+LOAD_CHUNK_ROWS = int(os.getenv("LOAD_CHUNK_ROWS", "100000"))
+# Chunks that touch the same keys can deadlock when upserted concurrently
+LOAD_DEADLOCK_RETRIES = 3
 
-def main():
-    connection = None
-    try:
-        # Connect to the database
-        logging.info("Connecting to the database...")
-        connection = psycopg2.connect(
-            host=DB_HOST,
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            port=DB_PORT,
+# Staging table, COPY statement, key and columns of each loaded table. The
+# staging tables are temporary and emptied on every commit, so a worker
+# connection can reuse its own for every chunk.
+TABLES = {
+    "employers": {
+        "staging": """
+            CREATE TEMP TABLE IF NOT EXISTS tmp_employers (
+                government_id BIGINT,
+                employer_name VARCHAR(100)
+            ) ON COMMIT DELETE ROWS;
+        """,
+        "copy": """
+            COPY tmp_employers (government_id, employer_name)
+            FROM STDIN
+            WITH (FORMAT csv, DELIMITER ';');
+        """,
+        "key": "government_id",
+        "columns": ("government_id", "employer_name"),
+    },
+    "employees": {
+        "staging": """
+            CREATE TEMP TABLE IF NOT EXISTS tmp_employees (
+                personal_id BIGINT,
+                first_name VARCHAR(50),
+                last_name VARCHAR(50),
+                position VARCHAR(100),
+                government_id BIGINT
+            ) ON COMMIT DELETE ROWS;
+        """,
+        "copy": """
+            COPY tmp_employees (personal_id, first_name, last_name, position, government_id)
+            FROM STDIN
+            WITH (FORMAT csv, DELIMITER ';');
+        """,
+        "key": "personal_id",
+        "columns": ("personal_id", "first_name", "last_name", "position", "government_id"),
+    },
+}
+
+
+def upsert_sql(table, delta):
+    """
+    Build the statement moving a chunk from the staging table into the table.
+
+    In delta mode a row is only rewritten when its content differs from the
+    current row, so unchanged rows cost a lookup instead of a new tuple.
+
+    Returns:
+        str: The upsert, returning the number of inserted and updated rows.
+    """
+    spec = TABLES[table]
+    key = spec["key"]
+    columns = ", ".join(spec["columns"])
+    values = [column for column in spec["columns"] if column != key]
+    assignments = ",\n                ".join(f"{column} = EXCLUDED.{column}" for column in values)
+    changed_only = (
+        f"WHERE ({', '.join(f'{table}.{column}' for column in values)}) "
+        f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in values)})"
+        if delta else ""
+    )
+    return f"""
+        WITH upserted AS (
+            INSERT INTO {table} ({columns})
+            SELECT DISTINCT ON ({key}) {columns} FROM tmp_{table}
+            ON CONFLICT ({key})
+            DO UPDATE SET
+                {assignments}
+            {changed_only}
+            RETURNING (xmax = 0) AS inserted
         )
-        cursor = connection.cursor()
+        SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted;
+    """
+
+
+def connect():
+    return psycopg2.connect(
+        host=DB_HOST,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        port=DB_PORT,
+    )
+
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = %s);",
+        (table, column),
+    )
+    return cursor.fetchone()[0]
+
+
+def function_exists(cursor, name):
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_proc WHERE proname = %s);", (name,))
+    return cursor.fetchone()[0]
+
+
+def trigger_exists(cursor, name):
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = %s);", (name,))
+    return cursor.fetchone()[0]
+
+
+def create_index(cursor, name, definition):
+    """
+    Build an index concurrently unless a valid one already exists.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so the cursor's
+    connection must be in autocommit mode. A concurrent build that failed
+    leaves an invalid index behind, which is dropped and built again.
+    """
+    cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s);", (name,))
+    row = cursor.fetchone()
+    if row and row[0]:
+        return
+    if row:
+        logging.info(f"Rebuilding the invalid index {name}...")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+    cursor.execute(f"CREATE INDEX CONCURRENTLY {name} {definition};")
+
 
-        # Step 1: Create employers and employees tables
-        logging.info("Creating employers and employees tables...")
+def create_schema(cursor):
+    """
+    Create the tables, the generated search vector column and the checkpoint table.
+    """
+    logging.info("Creating employers and employees tables...")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS employers (
+            government_id BIGINT PRIMARY KEY,
+            employer_name VARCHAR(100) NOT NULL
+        );
+    """)
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
+        );
+
+        """
+    )
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS employees (
+            personal_id BIGINT PRIMARY KEY,
+            first_name VARCHAR(50),
+            last_name VARCHAR(50),
+            position VARCHAR(100),
+            government_id BIGINT REFERENCES employers(government_id)
+        );
+    """)
+
+    # Weighted full-text search vector, maintained by Postgres on every insert and update.
+    # The catalogs are checked first, so a run against an existing schema takes no
+    # ACCESS EXCLUSIVE locks on tables the API is reading.
+    if not column_exists(cursor, "employees", "search_vector"):
+        logging.info("Adding the employees search vector column...")
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS employers (
-                government_id BIGINT PRIMARY KEY,
-                employer_name VARCHAR(100) NOT NULL
-            );
+            ALTER TABLE employees
+            ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', COALESCE(first_name, '')), 'A') ||
+                setweight(to_tsvector('english', COALESCE(last_name, '')), 'A') ||
+                setweight(to_tsvector('english', COALESCE(position, '')), 'B') ||
+                setweight(to_tsvector('english', COALESCE(government_id::TEXT, '')), 'C')
+            ) STORED;
         """)
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-        id SERIAL PRIMARY KEY,
-        username VARCHAR(50) NOT NULL UNIQUE,
-        password_hash TEXT NOT NULL,
-        created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
-            );
+    # Employer name search vector, matched by the employer searches
+    if not column_exists(cursor, "employers", "search_vector"):
+        logging.info("Adding the employers search vector column...")
+        cursor.execute("""
+            ALTER TABLE employers
+            ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (to_tsvector('english', employer_name)) STORED;
+        """)
 
-            """
-        )
+    # Employee count per employer, maintained by statement-level triggers on employees,
+    # so listing employers by size never has to count
+    if not column_exists(cursor, "employers", "headcount"):
+        logging.info("Adding the employers headcount column...")
+        cursor.execute("ALTER TABLE employers ADD COLUMN headcount INTEGER NOT NULL DEFAULT 0;")
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS employees (
-                personal_id BIGINT PRIMARY KEY,
-                first_name VARCHAR(50),
-                last_name VARCHAR(50),
-                position VARCHAR(100),
-                government_id BIGINT REFERENCES employers(government_id)
-            );
+            UPDATE employers e
+            SET headcount = c.employee_count
+            FROM (
+                SELECT government_id, count(*) AS employee_count
+                FROM employees
+                WHERE government_id IS NOT NULL
+                GROUP BY government_id
+            ) c
+            WHERE e.government_id = c.government_id;
         """)
+    create_headcount_triggers(cursor)
+
+    # Keys present in the files, collected for --delete-missing
+    for table, spec in TABLES.items():
+        cursor.execute(f"CREATE UNLOGGED TABLE IF NOT EXISTS load_seen_{table} ({spec['key']} BIGINT PRIMARY KEY);")
+
+    # Chunks committed by an interrupted run, skipped when the same file is loaded again
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS load_checkpoints (
+            source TEXT NOT NULL,
+            chunk_no INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            loaded_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
+            PRIMARY KEY (source, chunk_no)
+        );
+    """)
+
+
+def create_headcount_triggers(cursor):
+    """
+    Keep employers.headcount in step with the employees referencing each employer.
+    """
+    # Employer rows are locked in government_id order, so concurrent statements
+    # touching the same employers wait for each other instead of deadlocking
+    if not function_exists(cursor, "employers_apply_headcount"):
+        cursor.execute("""
+            CREATE FUNCTION employers_apply_headcount(government_ids BIGINT[], changes BIGINT[])
+            RETURNS void LANGUAGE plpgsql AS $$
+            BEGIN
+                PERFORM 1 FROM employers
+                WHERE government_id = ANY(government_ids)
+                ORDER BY government_id
+                FOR NO KEY UPDATE;
 
-        # Step 2: Create temporary tables
-        logging.info("Creating temporary tables...")
+                UPDATE employers e
+                SET headcount = e.headcount + d.change
+                FROM unnest(government_ids, changes) AS d(government_id, change)
+                WHERE e.government_id = d.government_id;
+            END;
+            $$;
+        """)
+    if not function_exists(cursor, "employers_headcount_sync"):
         cursor.execute("""
-            CREATE TEMP TABLE tmp_employers AS SELECT * FROM employers WITH NO DATA;
+            CREATE FUNCTION employers_headcount_sync()
+            RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    PERFORM employers_apply_headcount(array_agg(government_id), array_agg(change))
+                    FROM (
+                        SELECT government_id, count(*) AS change
+                        FROM new_rows
+                        WHERE government_id IS NOT NULL
+                        GROUP BY government_id
+                    ) d;
+                ELSIF TG_OP = 'DELETE' THEN
+                    PERFORM employers_apply_headcount(array_agg(government_id), array_agg(change))
+                    FROM (
+                        SELECT government_id, -count(*) AS change
+                        FROM old_rows
+                        WHERE government_id IS NOT NULL
+                        GROUP BY government_id
+                    ) d;
+                ELSE
+                    PERFORM employers_apply_headcount(array_agg(government_id), array_agg(change))
+                    FROM (
+                        SELECT government_id, sum(change) AS change
+                        FROM (
+                            SELECT government_id, 1 AS change FROM new_rows
+                            UNION ALL
+                            SELECT government_id, -1 AS change FROM old_rows
+                        ) moves
+                        WHERE government_id IS NOT NULL
+                        GROUP BY government_id
+                        HAVING sum(change) <> 0
+                    ) d;
+                END IF;
+                RETURN NULL;
+            END;
+            $$;
         """)
+    if not trigger_exists(cursor, "employees_headcount_insert"):
         cursor.execute("""
-            CREATE TEMP TABLE tmp_employees AS SELECT * FROM employees WITH NO DATA;
+            CREATE TRIGGER employees_headcount_insert
+            AFTER INSERT ON employees
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION employers_headcount_sync();
         """)
-
-        # Step 3: Load data into the temporary tables
-        logging.info("Loading data into tmp_employers from the CSV file...")
-        with open(EMPLOYERS_CSV_FILE_PATH, 'r') as employers_file:
-            cursor.copy_expert("""
-                COPY tmp_employers (government_id, employer_name)
-                FROM STDIN
-                DELIMITER ';'
-                CSV HEADER;
-            """, employers_file)
-
-        logging.info("Loading data into tmp_employees from the CSV file...")
-        with open(EMPLOYEES_CSV_FILE_PATH, 'r') as employees_file:
-            cursor.copy_expert("""
-                COPY tmp_employees (personal_id, first_name, last_name, position, government_id)
-                FROM STDIN
-                DELIMITER ';'
-                CSV HEADER;
-            """, employees_file)
-
-        # Step 4: Upsert data from the temporary tables
-        logging.info("Upserting data from tmp_employers to employers...")
+    if not trigger_exists(cursor, "employees_headcount_update"):
         cursor.execute("""
-            INSERT INTO employers (government_id, employer_name)
-            SELECT DISTINCT government_id, employer_name FROM tmp_employers
-            ON CONFLICT (government_id)
-            DO UPDATE SET employer_name = EXCLUDED.employer_name;
+            CREATE TRIGGER employees_headcount_update
+            AFTER UPDATE ON employees
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION employers_headcount_sync();
         """)
-
-        logging.info("Upserting data from tmp_employees to employees...")
+    if not trigger_exists(cursor, "employees_headcount_delete"):
         cursor.execute("""
-            INSERT INTO employees (personal_id, first_name, last_name, position, government_id)
-            SELECT DISTINCT personal_id, first_name, last_name, position, government_id FROM tmp_employees
-            ON CONFLICT (personal_id)
-            DO UPDATE SET
-                first_name = EXCLUDED.first_name,
-                last_name = EXCLUDED.last_name,
-                position = EXCLUDED.position,
-                government_id = EXCLUDED.government_id;
+            CREATE TRIGGER employees_headcount_delete
+            AFTER DELETE ON employees
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION employers_headcount_sync();
         """)
 
-        # Step 5: Drop the temporary tables
-        logging.info("Dropping temporary tables...")
-        cursor.execute("DROP TABLE tmp_employers;")
-        cursor.execute("DROP TABLE tmp_employees;")
+
+def create_indexes(cursor):
+    """
+    Create the search and pagination indexes once the data is in place.
+
+    The indexes are built concurrently, so the API keeps reading and writing the
+    tables meanwhile; the cursor's connection must be in autocommit mode.
+    """
+    logging.info("Creating the search vector GIN indexes...")
+    create_index(cursor, "employees_search_vector_idx", "ON employees USING GIN (search_vector)")
+    create_index(cursor, "employers_search_vector_idx", "ON employers USING GIN (search_vector)")
+
+    # Keyset pagination indexes, matching the ORDER BY of the unfiltered searches
+    logging.info("Creating the keyset pagination indexes...")
+    create_index(cursor, "employees_first_name_keyset_idx", "ON employees ((COALESCE(first_name, '')), personal_id)")
+    create_index(cursor, "employers_name_keyset_idx", "ON employers (employer_name, government_id)")
+
+    # Employer rosters page through employees by (government_id, personal_id),
+    # and employers are listed by size
+    logging.info("Creating the employer roster and headcount indexes...")
+    create_index(cursor, "employees_government_id_keyset_idx", "ON employees (government_id, personal_id)")
+    create_index(cursor, "employers_headcount_keyset_idx", "ON employers (headcount, government_id)")
+
+    # Trigram indexes for the typeahead suggestions (word similarity and prefix matches)
+    logging.info("Creating the trigram suggestion indexes...")
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm');")
+    if not cursor.fetchone()[0]:
+        cursor.execute("CREATE EXTENSION pg_trgm;")
+    create_index(cursor, "employers_name_trgm_idx", "ON employers USING GIN (employer_name gin_trgm_ops)")
+    # Same expression as EMPLOYEE_FULL_NAME_SQL in app/database/employees.py
+    create_index(
+        cursor,
+        "employees_full_name_trgm_idx",
+        "ON employees USING GIN ((COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')) gin_trgm_ops)",
+    )
+
+
+def source_fingerprint(path, chunk_rows):
+    """
+    Identify a CSV file and its chunking, so checkpoints are only reused for the same input.
+    """
+    stat = os.stat(path)
+    return f"{os.path.basename(path)}:{stat.st_size}:{int(stat.st_mtime)}:{chunk_rows}"
+
+
+def iter_chunks(path, chunk_rows):
+    """
+    Split a CSV file into chunks of chunk_rows lines, without its header line.
+
+    Rows are split on line endings, so quoted fields must not contain newlines.
+
+    Yields:
+        Tuple[int, bytes, int]: The chunk number, the CSV data and its number of rows.
+    """
+    with open(path, "rb") as csv_file:
+        csv_file.readline()
+        chunk_no = 0
+        lines = []
+        for line in csv_file:
+            if not line.strip():
+                continue
+            lines.append(line)
+            if len(lines) == chunk_rows:
+                yield chunk_no, b"".join(lines), len(lines)
+                chunk_no += 1
+                lines = []
+        if lines:
+            yield chunk_no, b"".join(lines), len(lines)
+
+
+class ChunkLoader:
+    """
+    Loads chunks of one CSV file on a pool of threads, one connection per thread.
+    """
+
+    def __init__(self, table, source, delta=False, track_keys=False):
+        self.table = TABLES[table]
+        self.name = table
+        self.source = source
+        self.upsert = upsert_sql(table, delta)
+        self.track_keys = track_keys
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect()
+            with connection.cursor() as cursor:
+                cursor.execute(self.table["staging"])
+            connection.commit()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def load_chunk(self, chunk_no, data, row_count):
+        """
+        COPY one chunk into the staging table, upsert it and record its checkpoint, in one transaction.
+
+        Returns:
+            Dict[str, int]: The number of rows in the chunk, and of inserted and updated rows.
+        """
+        connection = self._connection()
+        for attempt in range(1, LOAD_DEADLOCK_RETRIES + 1):
+            try:
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(self.table["copy"], io.BytesIO(data))
+                    cursor.execute(self.upsert)
+                    inserted, updated = cursor.fetchone()
+                    if self.track_keys:
+                        key = self.table["key"]
+                        cursor.execute(f"""
+                            INSERT INTO load_seen_{self.name} ({key})
+                            SELECT DISTINCT {key} FROM tmp_{self.name}
+                            ON CONFLICT DO NOTHING;
+                        """)
+                    cursor.execute(
+                        "INSERT INTO load_checkpoints (source, chunk_no, row_count) VALUES (%s, %s, %s);",
+                        (self.source, chunk_no, row_count),
+                    )
+                connection.commit()
+                return {"rows": row_count, "inserted": inserted, "updated": updated}
+            except psycopg2.errors.DeadlockDetected:
+                connection.rollback()
+                if attempt == LOAD_DEADLOCK_RETRIES:
+                    raise
+                logging.warning(f"Deadlock on {self.name} chunk {chunk_no}, retrying ({attempt})...")
+            except Exception:
+                connection.rollback()
+                raise
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+
+
+def load_file(cursor, table, path, workers, chunk_rows, restart, delta=False, track_keys=False):
+    """
+    Load a CSV file into a table in parallel chunks, resuming after the last run's checkpoints.
+
+    Args:
+        cursor: A cursor on the coordinating connection, used for the checkpoints.
+        table (str): "employers" or "employees".
+        path (str): Path to the CSV file, with a header line and ';' delimiters.
+        workers (int): Number of chunks loaded at once.
+        chunk_rows (int): Number of rows per chunk.
+        restart (bool): Ignore the checkpoints of a previous run.
+        delta (bool): Only write rows that are new or changed.
+        track_keys (bool): Record the keys of the file in load_seen_<table>, for delete_missing.
+
+    Returns:
+        Dict[str, int]: The rows read by this run, and how many were inserted, updated or unchanged.
+    """
+    source = source_fingerprint(path, chunk_rows)
+    if restart:
+        cursor.execute("DELETE FROM load_checkpoints WHERE source = %s;", (source,))
+    # Checkpoints of an older version of this file no longer apply
+    cursor.execute(
+        "DELETE FROM load_checkpoints WHERE starts_with(source, %s) AND source <> %s;",
+        (f"{os.path.basename(path)}:", source),
+    )
+    cursor.execute("SELECT chunk_no FROM load_checkpoints WHERE source = %s;", (source,))
+    done = {row[0] for row in cursor.fetchall()}
+    cursor.connection.commit()
+    if done:
+        logging.info(f"Resuming {table}: {len(done)} chunks already loaded")
+    elif track_keys:
+        cursor.execute(f"TRUNCATE load_seen_{table};")
+        cursor.connection.commit()
+
+    loader = ChunkLoader(table, source, delta, track_keys)
+    stats = {"rows": 0, "inserted": 0, "updated": 0}
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for chunk_no, data, row_count in iter_chunks(path, chunk_rows):
+                if chunk_no in done:
+                    continue
+                # Keep at most two chunks per worker in memory
+                while len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        add_stats(stats, future.result())
+                    elapsed = time.monotonic() - started
+                    logging.info(f"{table}: {stats['rows']} rows, {stats['rows'] / max(elapsed, 1e-9):.0f} rows/s")
+                pending.add(executor.submit(loader.load_chunk, chunk_no, data, row_count))
+            for future in pending:
+                add_stats(stats, future.result())
+    finally:
+        loader.close()
+
+    elapsed = time.monotonic() - started
+    logging.info(
+        f"Loaded {stats['rows']} rows into {table} in {elapsed:.1f}s "
+        f"({stats['rows'] / max(elapsed, 1e-9):.0f} rows/s)"
+    )
+
+    # The file is fully loaded, a later run starts from scratch
+    cursor.execute("DELETE FROM load_checkpoints WHERE source = %s;", (source,))
+    cursor.connection.commit()
+    stats["unchanged"] = stats["rows"] - stats["inserted"] - stats["updated"]
+    return stats
+
+
+def add_stats(stats, chunk_stats):
+    for name, value in chunk_stats.items():
+        stats[name] += value
+
+
+def delete_missing(cursor, table):
+    """
+    Delete the rows whose key was not in the loaded file.
+
+    Employers still referenced by an employee are kept. Nothing is deleted
+    when no keys were recorded, so an empty or missing file cannot wipe a table.
+
+    Returns:
+        int: The number of deleted rows.
+    """
+    key = TABLES[table]["key"]
+    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM load_seen_{table});")
+    if not cursor.fetchone()[0]:
+        logging.warning(f"No {table} keys were recorded, skipping deletes")
+        return 0
+
+    still_referenced = ""
+    if table == "employers":
+        still_referenced = "AND NOT EXISTS (SELECT 1 FROM employees e WHERE e.government_id = t.government_id)"
+    cursor.execute(f"""
+        DELETE FROM {table} t
+        WHERE NOT EXISTS (SELECT 1 FROM load_seen_{table} s WHERE s.{key} = t.{key})
+        {still_referenced};
+    """)
+    deleted = cursor.rowcount
+    cursor.execute(f"TRUNCATE load_seen_{table};")
+    cursor.connection.commit()
+    return deleted
+
+
+def invalidate_caches():
+    """
+    Move the API's cached employee and employer reads to a new generation.
+
+    Employee searches also match on government_id, so both are bumped after any
+    change. A Redis failure is logged by bump_generation; the cached reads then
+    expire after CACHE_EXPIRATION.
+    """
+    async def bump():
+        try:
+            for entity in ("employers", "employees"):
+                generation = await bump_generation(entity)
+                if generation is not None:
+                    logging.info(f"Cached {entity} reads invalidated (generation {generation})")
+        finally:
+            await close_redis()
+
+    asyncio.run(bump())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load the employers and employees CSV files.")
+    parser.add_argument("--employers", default=EMPLOYERS_CSV_FILE_PATH, help="Path to employers.csv")
+    parser.add_argument("--employees", default=EMPLOYEES_CSV_FILE_PATH, help="Path to employees.csv")
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS, help="Connections running COPY at once")
+    parser.add_argument("--chunk-rows", type=int, default=LOAD_CHUNK_ROWS, help="Rows per chunk and transaction")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints of an interrupted run")
+    parser.add_argument("--delta", action="store_true", help="Only write new and changed rows")
+    parser.add_argument(
+        "--delete-missing", action="store_true", help="Delete rows that are not in the files"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    connection = None
+    # Per table change counts. Chunks are committed as they load, so a run that
+    # fails before the counts are complete may have changed rows too.
+    summary = None
+    counted = False
+    failed = False
+    try:
+        # Connect to the database
+        logging.info("Connecting to the database...")
+        connection = connect()
+        cursor = connection.cursor()
+
+        # Step 1: Create the tables
+        create_schema(cursor)
+        connection.commit()
+
+        # Step 2: Load the employers first, so the employees' foreign key holds
+        summary = {}
+        logging.info("Loading employers...")
+        summary["employers"] = load_file(
+            cursor, "employers", args.employers, args.workers, args.chunk_rows, args.restart,
+            delta=args.delta, track_keys=args.delete_missing,
+        )
+
+        # Step 3: Load the employees
+        logging.info("Loading employees...")
+        summary["employees"] = load_file(
+            cursor, "employees", args.employees, args.workers, args.chunk_rows, args.restart,
+            delta=args.delta, track_keys=args.delete_missing,
+        )
+
+        # Step 4: Delete what is no longer in the files, employees first so employers are unreferenced
+        for table in ("employees", "employers"):
+            summary[table]["deleted"] = delete_missing(cursor, table) if args.delete_missing else 0
+        counted = True
+
+        logging.info("Change summary:")
+        for table, stats in summary.items():
+            logging.info(
+                f"  {table}: {stats['inserted']} inserted, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['deleted']} deleted"
+            )
 
         # Commit the changes
         connection.commit()
+
+        # Step 5: Create the search and pagination indexes once the data is in place,
+        # outside any transaction so they can be built concurrently
+        connection.autocommit = True
+        create_indexes(cursor)
         logging.info("Data successfully loaded into the employers and employees tables.")
 
     except Exception as e:
-        if connection:
+        failed = True
+        if connection and not connection.autocommit:
             connection.rollback()
         logging.error(f"An error occurred: {e}")
     finally:
@@ -134,6 +677,15 @@ def main():
             connection.close()
             logging.info("Database connection closed.")
 
+    changed = any(
+        stats.get("inserted") or stats.get("updated") or stats.get("deleted")
+        for stats in (summary or {}).values()
+    )
+    if changed or (summary is not None and not counted):
+        invalidate_caches()
+    if failed:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+import app.cache.redis as cache_redis
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache_redis, "redis_client", client)
+    return client
+
+
+def test_bump_from_another_worker_is_seen_at_once(redis_client):
+    async def scenario():
+        before = await cache_redis.versioned_cache_key("search_employees", "employees", "alice:0:10:None")
+        # Another worker commits a write
+        await redis_client.incr(f"{cache_redis.GENERATION_KEY}:employees")
+        after = await cache_redis.versioned_cache_key("search_employees", "employees", "alice:0:10:None")
+        assert before != after
+        assert ":g1:" in after
+
+    asyncio.run(scenario())
+
+
+def test_versioned_cache_keys_share_one_generation(redis_client):
+    async def scenario():
+        await cache_redis.bump_generation("employers")
+        keys = await cache_redis.versioned_cache_keys("search_employers", "employers", ["a", "b"])
+        assert keys == [
+            f"search_employers:v{cache_redis.CACHE_FORMAT_VERSION}:g1:a",
+            f"search_employers:v{cache_redis.CACHE_FORMAT_VERSION}:g1:b",
+        ]
+
+    asyncio.run(scenario())
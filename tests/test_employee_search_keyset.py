@@ -0,0 +1,77 @@
+import os
+
+import orjson
+import psycopg
+import pytest
+
+from app.database.employees import employee_search_sql, encode_employee_page
+from app.database.pagination import decode_cursor, decode_page
+
+
+@pytest.fixture
+def connection():
+    try:
+        connection = psycopg.connect(
+            dbname=os.getenv("DB_NAME"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            host=os.getenv("DB_HOST"),
+            port=os.getenv("DB_PORT"),
+            connect_timeout=3,
+        )
+    except psycopg.OperationalError as e:
+        pytest.skip(f"Postgres is not reachable: {e}")
+    with connection:
+        # A temporary table shadows employees for this session only
+        connection.execute("""
+            CREATE TEMPORARY TABLE employees (
+                personal_id BIGINT PRIMARY KEY,
+                first_name VARCHAR(50),
+                last_name VARCHAR(50),
+                position VARCHAR(100),
+                government_id BIGINT,
+                search_vector TSVECTOR
+            )
+        """)
+        yield connection
+        connection.rollback()
+
+
+def walk(connection, term: str, limit: int):
+    """Page through a search with cursors, the way fetch_employees_page does."""
+    seen, after = [], None
+    for _ in range(100):
+        query = employee_search_sql(is_numeric=False, keyset=after is not None)
+        rows = connection.execute(query, [term, *(after or []), limit + 1, 0]).fetchall()
+        body, next_cursor = decode_page(encode_employee_page(rows, limit))
+        seen.extend(employee["personal_id"] for employee in orjson.loads(body))
+        if not next_cursor:
+            return seen
+        after = decode_cursor(next_cursor, (float, int))
+    pytest.fail("Pagination did not terminate")
+
+
+@pytest.mark.parametrize("weight", ["A", "B", "C", "D"])
+def test_tied_ranks_are_paged_exactly_once(connection, weight):
+    # Every row gets the same rank, a real that is not exactly representable as a float8
+    connection.execute(
+        """
+        INSERT INTO employees (personal_id, first_name, last_name, position, search_vector)
+        SELECT id, 'Noa', 'Cohen', 'Engineer', setweight(to_tsvector('english', 'Noa'), %s::"char")
+        FROM generate_series(1, 7) AS id
+        """,
+        [weight],
+    )
+    assert walk(connection, "Noa", limit=2) == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_distinct_ranks_are_paged_in_order(connection):
+    connection.execute("""
+        INSERT INTO employees (personal_id, first_name, last_name, position, search_vector)
+        SELECT id, 'Noa', 'Cohen', 'Engineer',
+            setweight(to_tsvector('english', 'Noa'), (ARRAY['A', 'B', 'C', 'D'])[id % 4 + 1]::"char")
+        FROM generate_series(1, 12) AS id
+    """)
+    seen = walk(connection, "Noa", limit=5)
+    assert sorted(seen) == list(range(1, 13))
+    assert len(seen) == 12
@@ -0,0 +1,20 @@
+import asyncio
+import os
+import signal
+
+import app.auth.hashing as hashing
+
+
+def test_broken_pool_is_replaced_and_the_call_retried():
+    async def scenario():
+        hashed = await hashing.hash_password_async("secret")
+        broken = hashing._executor
+        # Kill a worker, as the OOM killer would
+        os.kill(next(iter(broken._processes)), signal.SIGKILL)
+        assert await hashing.verify_password_async("secret", hashed)
+        assert hashing._executor is not broken
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        hashing.shutdown_password_pool()
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+import app.cache.redis as cache_redis
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache_redis, "redis_client", client)
+    monkeypatch.setattr(cache_redis, "POPULAR_SEARCHES_MAX", 3)
+    return client
+
+
+def test_popular_searches_keep_only_the_top_terms(redis_client):
+    async def scenario():
+        for search, times in (("alice", 5), ("bob", 4), ("carol", 3), ("dave", 2), ("erin", 1)):
+            for _ in range(times):
+                await cache_redis.get_cached(f"missing:{search}", "search_employees", search)
+        key = f"{cache_redis.POPULAR_SEARCHES_KEY}:search_employees"
+        assert await redis_client.zrange(key, 0, -1) == [b"carol", b"bob", b"alice"]
+        assert 0 < await redis_client.ttl(key) <= cache_redis.POPULAR_SEARCHES_EXPIRATION
+
+    asyncio.run(scenario())
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from app.cache.single_flight import _coalesce, _inflight
+
+
+def test_cancelled_leader_does_not_fail_waiters():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"value"
+
+    async def scenario():
+        leader = asyncio.create_task(_coalesce("key", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(_coalesce("key", load))
+        await asyncio.sleep(0)
+
+        # The leader's client goes away while the value is being computed
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        assert await follower == b"value"
+        assert calls == [1]
+        assert "key" not in _inflight
+
+    asyncio.run(scenario())
+
+
+def test_waiters_share_the_leader_error():
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def scenario():
+        results = await asyncio.gather(*(_coalesce("key", load) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert "key" not in _inflight
+
+    asyncio.run(scenario())
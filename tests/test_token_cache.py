@@ -0,0 +1,17 @@
+from app.auth.jwt import create_access_token, verified_tokens, verify_token
+
+
+def test_cached_tokens_are_stored_as_bytes_and_decoded_on_hit():
+    verified_tokens.clear()
+    token = create_access_token({"sub": "alice", "role": "admin"})
+
+    first = verify_token(token)
+    assert verified_tokens.stats()["entries"] == 1
+    assert all(isinstance(value, bytes) for _, value, _ in verified_tokens._entries.values())
+
+    second = verify_token(token)
+    assert second == first
+    assert second["sub"] == "alice"
+    # Each hit decodes its own copy, so callers cannot alter the cached payload
+    second["sub"] = "mallory"
+    assert verify_token(token)["sub"] == "alice"